@@ -0,0 +1,121 @@
+import numpy as np
+from bitboard import *
+
+
+# numpy versions of the bitboard constants, kept unsigned so that no
+# operation falls back to floats
+ONE = np.uint64(1)
+BATCH_FULL_MASK = np.uint64(FULL_MASK)
+BATCH_QUARTER_MASK = np.uint64(QUARTER_MASK)
+BATCH_LINE_MASKS_5 = np.array(LINE_MASKS_5, dtype=np.uint64)
+BATCH_MASK_ROTATIONS = np.array(MASK_ROTATIONS, dtype=np.uint64)
+BIT_SHIFTS = np.arange(36, dtype=np.uint64)
+
+
+def findWinners(black: np.ndarray, white: np.ndarray) -> np.ndarray:
+    """
+    Check many positions for the end of the game at once
+
+    Args:
+    - black, white: uint64 arrays of occupancy masks
+
+    Return:
+    - An int8 array of bitboard.findWinner results
+    """
+    blackWon = ((black[:, None] & BATCH_LINE_MASKS_5) == BATCH_LINE_MASKS_5).any(axis=1)
+    whiteWon = ((white[:, None] & BATCH_LINE_MASKS_5) == BATCH_LINE_MASKS_5).any(axis=1)
+    full = (black | white) == BATCH_FULL_MASK
+    ret = np.where(full, 0, -1).astype(np.int8)
+    ret[blackWon] = 1
+    ret[whiteWon] = 2
+    ret[blackWon & whiteWon] = 0
+    return ret
+
+
+def rotateMasks(masks: np.ndarray, quarters: np.ndarray, directions: np.ndarray) -> np.ndarray:
+    """
+    Rotate one quarter of every mask, see bitboard.rotateMask
+
+    Args:
+    - masks: a uint64 array of occupancy masks
+    - quarters, directions: arrays of the quarter and direction for every mask
+    """
+    shifts = quarters.astype(np.uint64) * np.uint64(9)
+    bits = masks >> shifts & BATCH_QUARTER_MASK
+    return masks ^ (bits ^ BATCH_MASK_ROTATIONS[directions, bits.astype(np.intp)]) << shifts
+
+
+def playBatch(black, white, rng: np.random.Generator) -> np.ndarray:
+    """
+    Play random games to their end in lockstep. Every game plays one
+    uniformly random legal move per step and finished games are dropped
+    from the arrays.
+
+    Args:
+    - black, white: sequences of the occupancy masks to start from
+    - rng: the random generator
+
+    Return:
+    - An int8 array with the bitboard.findWinner result of every game
+    """
+    black, white = np.array(black, dtype=np.uint64), np.array(white, dtype=np.uint64)
+    ret = findWinners(black, white)
+    alive = np.flatnonzero(ret < 0)
+    black, white = black[alive], white[alive]
+    while len(alive):
+        empty = (BATCH_FULL_MASK ^ (black | white))[:, None] >> BIT_SHIFTS & ONE
+        blackToMove = empty.sum(axis=1) % 2 == 0
+        # the largest random key among the empty cells picks a uniform one
+        cells = np.where(empty == ONE, rng.random(empty.shape), -1.0).argmax(axis=1)
+        placed = ONE << cells.astype(np.uint64)
+        black = np.where(blackToMove, black | placed, black)
+        white = np.where(blackToMove, white, white | placed)
+        rotations = rng.integers(0, 8, len(alive))
+        quarters, directions = rotations >> 1, rotations & 1
+        black, white = rotateMasks(black, quarters, directions), rotateMasks(white, quarters, directions)
+        winners = findWinners(black, white)
+        done = winners >= 0
+        ret[alive[done]] = winners[done]
+        alive, black, white = alive[~done], black[~done], white[~done]
+    return ret
+
+
+class BatchPlayout:
+    """
+    Plays many random games from one state at once with numpy
+    """
+
+    def __init__(self, seed=None) -> None:
+        """
+        Constructor
+
+        Args:
+        - seed: the seed of the random generator, None for a random one
+        """
+        self.rng = np.random.default_rng(seed)
+
+    def run(self, state: int, count: int) -> list:
+        """
+        Play random games from a state
+
+        Args:
+        - state: the state to start from
+        - count: the number of games
+
+        Return:
+        - The [loses, ties, wins] tallies for the player to move in state
+        """
+        black, white = toMasks(state)
+        color = popCount(black | white) % 2 + 1
+        winners = playBatch(np.full(count, black), np.full(count, white), self.rng)
+        ties = int((winners == 0).sum())
+        wins = int((winners == color).sum())
+        return [count - ties - wins, ties, wins]
+
+
+if __name__ == "__main__":
+    from time import time
+    playout = BatchPlayout(0)
+    start_time = time()
+    print(playout.run(5115112716510, 10000))
+    print("--- %s seconds ---" % (time() - start_time))
@@ -0,0 +1,255 @@
+from data import *
+from tables import *
+from patterns import patternsScore
+
+
+# occupancy of the whole board
+FULL_MASK = (1 << 36) - 1
+
+
+def popCount(a: int) -> int:
+    """
+    Count the set bits of a mask
+    """
+    return bin(a).count("1")
+
+
+# use the builtin where available (Python 3.10+)
+if hasattr(int, "bit_count"):
+    popCount = int.bit_count
+
+
+def cellBit(quarter: int, cell: int) -> int:
+    """
+    Get the bit representing a cell
+
+    Args:
+    - quarter: the quarter index
+    - cell: the cell index inside the quarter
+
+    Return:
+    - A mask with only the cell's bit set
+    """
+    return 1 << (9 * quarter + cell)
+
+
+def cellsMask(cells) -> int:
+    """
+    Get the mask covering a list of (quarter, cell) pairs
+    """
+    ret = 0
+    for quarter, cell in cells:
+        ret |= cellBit(quarter, cell)
+    return ret
+
+
+# line masks
+LINE_MASKS_5 = [cellsMask(line) for line in LINES_5]
+LINE_MASKS_4 = [(cellsMask(line), cellsMask(nullifiers), len(nullifiers)) for line, nullifiers in LINES_4]
+LINE_MASKS_3 = [(cellsMask(line), cellsMask(nullifiers), len(nullifiers)) for line, nullifiers in LINES_3]
+CRITICAL_MASKS = [cellsMask(cells) for cells in CRITICAL_CELLS]
+
+# LINES_5 indices through each cell bit
+CELL_LINES = [[i for i, line in enumerate(LINE_MASKS_5) if line >> bit & 1] for bit in range(36)]
+
+# LINES_5 masks a move can complete, indexed by placed bit * 4 + rotated quarter
+MOVE_LINES = [
+    [LINE_MASKS_5[i] for i in sorted(set(CELL_LINES[bit]).union(*CELL_LINES[9 * quarter:9 * quarter + 9]))]
+    for bit in range(36) for quarter in range(4)
+]
+
+
+def toMasks(state: int) -> tuple:
+    """
+    Convert a base-3 state to occupancy masks
+
+    Args:
+    - state: the base-3 state
+
+    Return:
+    - A (black, white) pair of 36-bit masks
+    """
+    black, white = 0, 0
+    for shift in range(0, 36, 9):
+        state, value = divmod(state, POW_QUARTERS[1])
+        bits = QUARTER_BITS[value]
+        black |= (bits & QUARTER_MASK) << shift
+        white |= (bits >> 9) << shift
+    return black, white
+
+
+def fromMasks(black: int, white: int) -> int:
+    """
+    Convert occupancy masks to a base-3 state
+
+    Args:
+    - black: the mask of black cells
+    - white: the mask of white cells
+
+    Return:
+    - The base-3 state
+    """
+    ret = 0
+    for quarter in range(4):
+        shift = 9 * quarter
+        ret += (QUARTER_VALUES[black >> shift & QUARTER_MASK] + 2 * QUARTER_VALUES[white >> shift & QUARTER_MASK]) * POW_QUARTERS[quarter]
+    return ret
+
+
+def rotateMask(mask: int, quarter: int, direction: int) -> int:
+    """
+    Rotate a quarter of an occupancy mask
+
+    Args:
+    - mask: the occupancy mask
+    - quarter: the quarter to rotate
+    - direction: 0 for ROTATE_CW, 1 for ROTATE_CCW
+
+    Return:
+    - The rotated mask
+    """
+    shift = 9 * quarter
+    bits = mask >> shift & QUARTER_MASK
+    return mask ^ (bits ^ MASK_ROTATIONS[direction][bits]) << shift
+
+
+def findWinner(black: int, white: int) -> int:
+    """
+    Check if the game ended
+
+    Return:
+    - -1: not ended
+    - 0: tie
+    - 1: black wins
+    - 2: white wins
+    """
+    blackWon, whiteWon = False, False
+    for line in LINE_MASKS_5:
+        if black & line == line:
+            blackWon = True
+        elif white & line == line:
+            whiteWon = True
+    if blackWon:
+        return 0 if whiteWon else 1
+    if whiteWon:
+        return 2
+    return 0 if black | white == FULL_MASK else -1
+
+
+def findWinnerAfterMove(black: int, white: int, bit: int, quarter: int) -> int:
+    """
+    Check if the game ended after a move, looking only at the lines the
+    move touched. The position before the move must not be terminal.
+
+    Args:
+    - black: the mask of black cells after the move
+    - white: the mask of white cells after the move
+    - bit: the bit of the placed piece, before the rotation
+    - quarter: the rotated quarter
+
+    Return:
+    - Same as findWinner
+    """
+    blackWon, whiteWon = False, False
+    for line in MOVE_LINES[bit * 4 + quarter]:
+        if black & line == line:
+            blackWon = True
+        elif white & line == line:
+            whiteWon = True
+    if blackWon:
+        return 0 if whiteWon else 1
+    if whiteWon:
+        return 2
+    return 0 if black | white == FULL_MASK else -1
+
+
+def criticalScore(black: int, white: int) -> int:
+    """
+    Get the score of the critical cells, black's score minus white's score
+    """
+    ret = 0
+    for i in range(2):
+        ret += WEIGHT_CRITICAL_CELLS[i] * (popCount(black & CRITICAL_MASKS[i]) - popCount(white & CRITICAL_MASKS[i]))
+    return ret
+
+
+def terminalScore(winnerColor: int, turn: int) -> int:
+    """
+    Get the score Node.eval gives to an ended game
+    """
+    if winnerColor == 0:
+        return 0
+    return 2 * WEIGHT_LINES_5 if winnerColor == turn else -2 * WEIGHT_LINES_5
+
+
+def evaluateMasks(black: int, white: int) -> int:
+    """
+    Evaluate a position given by occupancy masks, same as Node.eval
+    """
+    winnerColor = findWinner(black, white)
+    turn = popCount(black | white) % 2 + 1
+    if winnerColor >= 0:
+        return terminalScore(winnerColor, turn)
+    score = patternsScore(black, white) + criticalScore(black, white)
+    return score if turn == 1 else -score
+
+
+def playMove(black: int, white: int, move: int) -> tuple:
+    """
+    Play a move on occupancy masks
+
+    Args:
+    - black, white: the occupancy masks
+    - move: the move code, see gamenode.encodeMove
+
+    Return:
+    - The (black, white) masks after the move
+    """
+    bit, quarter, direction = move >> 3, move >> 1 & 3, move & 1
+    if popCount(black | white) % 2 == 0:
+        black |= 1 << bit
+    else:
+        white |= 1 << bit
+    return rotateMask(black, quarter, direction), rotateMask(white, quarter, direction)
+
+
+def generateMaskMoves(black: int, white: int):
+    """
+    Lazily generate all possible moves of a position given by occupancy
+    masks
+
+    Yield:
+    - (move, nextBlack, nextWhite) triples, where move comes from
+      gamenode.encodeMove. Moves leading to an already generated
+      position are skipped.
+    """
+    generated = set()
+    occupied = black | white
+    blackMoves = popCount(occupied) % 2 == 0
+    for bit in range(36):
+        if occupied >> bit & 1:
+            continue
+        # place a new piece
+        placedBlack, placedWhite = black, white
+        if blackMoves:
+            placedBlack |= 1 << bit
+        else:
+            placedWhite |= 1 << bit
+        # rotate
+        for quarter in range(4):
+            for direction in range(2):
+                nextBlack, nextWhite = rotateMask(placedBlack, quarter, direction), rotateMask(placedWhite, quarter, direction)
+                board = nextBlack | nextWhite << 36
+                if board not in generated:
+                    generated.add(board)
+                    # same code as encodeMove(bit // 9, bit % 9, quarter, direction)
+                    yield (bit * 4 + quarter) * 2 + direction, nextBlack, nextWhite
+
+
+def generateMoves(black: int, white: int):
+    """
+    Lazily generate the (move, nextState) pairs of all possible moves,
+    see generateMaskMoves
+    """
+    for move, nextBlack, nextWhite in generateMaskMoves(black, white):
+        yield move, fromMasks(nextBlack, nextWhite)
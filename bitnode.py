@@ -0,0 +1,118 @@
+from bitboard import *
+from gamenode import Node
+
+
+class BitNode(Node):
+    """
+    Represent a state of the game with two occupancy masks
+    """
+
+    def setState(self, hashValue: int):
+        self.black, self.white = toMasks(hashValue)
+
+    def getState(self) -> int:
+        return fromMasks(self.black, self.white)
+
+    # keep the base-3 attribute of Node available
+    state = property(getState, setState)
+
+    def getQuarter(self, index: int) -> int:
+        """
+        Get the state of a quarter
+        """
+        shift = 9 * index
+        return QUARTER_VALUES[self.black >> shift & QUARTER_MASK] + 2 * QUARTER_VALUES[self.white >> shift & QUARTER_MASK]
+
+    def getCell(self, quarter: int, cell: int) -> int:
+        """
+        Get the state of a cell
+        """
+        bit = cellBit(quarter, cell)
+        if self.black & bit:
+            return 1
+        if self.white & bit:
+            return 2
+        return 0
+
+    def rotate(self, quarter, swapList):
+        """
+        Rotate a quarter
+        """
+        direction = ROTATIONS.index(swapList)
+        self.black = rotateMask(self.black, quarter, direction)
+        self.white = rotateMask(self.white, quarter, direction)
+
+    def countEmptyCells(self) -> int:
+        """
+        Count empty cells
+        """
+        return 36 - popCount(self.black | self.white)
+
+    def getEmptyCells(self) -> list:
+        """
+        Get a list of all empty cells
+        """
+        occupied = self.black | self.white
+        ret = []
+        for quarter in range(4):
+            for cell in range(9):
+                if not occupied & cellBit(quarter, cell):
+                    ret.append((quarter, cell))
+        return ret
+
+    def terminal(self) -> int:
+        """
+        Check if the game ended
+
+        Return:
+        - -1: not ended
+        - 0: tie
+        - 1: black wins
+        - 2: white wins
+        """
+        return findWinner(self.black, self.white)
+
+    def nextMoves(self):
+        """
+        Lazily generate all possible moves, see bitboard.generateMoves
+        """
+        return generateMoves(self.black, self.white)
+
+    def getTurn(self) -> int:
+        """
+        Get current turn
+
+        Return:
+        - 1: black
+        - 2: white
+        """
+        return self.countEmptyCells() % 2 + 1
+
+    def fillCell(self, quarter, cell):
+        if self.getTurn() == 1:
+            self.black |= cellBit(quarter, cell)
+        else:
+            self.white |= cellBit(quarter, cell)
+
+    def makeMove(self, quarter, cell, rotatedQuarter, swapList) -> int:
+        """
+        Place a piece and rotate a quarter, checking only the lines the
+        move touched. The node must not be terminal before the move.
+        """
+        self.fillCell(quarter, cell)
+        self.rotate(rotatedQuarter, swapList)
+        return findWinnerAfterMove(self.black, self.white, 9 * quarter + cell, rotatedQuarter)
+
+    def __hash__(self) -> int:
+        return self.getState()
+
+    def eval(self):
+        """
+        Evaluation function
+        """
+        return evaluateMasks(self.black, self.white)
+
+
+if __name__ == "__main__":
+    print(BitNode(67959325095502806 + 3**12))
+    print(BitNode(67959325095502806 + 3**12).eval())
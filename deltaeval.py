@@ -0,0 +1,160 @@
+from bitboard import *
+
+
+# all scored lines as (line mask, nullifiers mask, nullifiers count, weights)
+SCORED_LINES = [entry + (WEIGHT_LINES_3,) for entry in LINE_MASKS_3] + [entry + (WEIGHT_LINES_4,) for entry in LINE_MASKS_4]
+
+# scored line masks before a rotation, indexed by quarter * 2 + direction
+SCORED_LINE_PREIMAGES = [
+    [rotateMask(line, quarter, 1 - direction) for line, _, _, _ in SCORED_LINES]
+    for quarter in range(4) for direction in range(2)
+]
+
+
+def lineScore(index: int, black: int, white: int) -> int:
+    """
+    Get the score of a scored line, black's score minus white's score.
+    Two mask compares are cheaper here than a patterns.LINE_MASK_PATTERNS
+    lookup, which pays for hashing the 72-bit board.
+    """
+    line, nullifiers, advantage, score = SCORED_LINES[index]
+    if black & line == line:
+        return score[0 if black & nullifiers else advantage - popCount(white & nullifiers)]
+    if white & line == line:
+        return -score[0 if white & nullifiers else advantage - popCount(black & nullifiers)]
+    return 0
+
+
+class DeltaEvaluator:
+    """
+    Evaluate positions incrementally from a parent position.
+
+    A line only changes the score while it is full of one color, so the
+    score of a child is the parent score plus the change of the lines
+    that were full in the parent or can be full after the move. Scores
+    are the same as Node.eval.
+    """
+
+    def __init__(self, state: int = 0) -> None:
+        """
+        Constructor
+
+        Args:
+        - state: the parent position, must not be terminal
+        """
+        self.setState(state)
+
+    def setState(self, state: int):
+        """
+        Score a new parent position from scratch
+        """
+        self.black, self.white = toMasks(state)
+        self.lineScores = [lineScore(i, self.black, self.white) for i in range(len(SCORED_LINES))]
+        self.linesScore = sum(self.lineScores)
+        # bitmask over the indices of lines with a score
+        self.activeLines = sum(1 << i for i, score in enumerate(self.lineScores) if score)
+        # lines that can be full after each rotation, filled when needed
+        self.candidateLines = dict()
+
+    def getCandidateLines(self, rotation: int) -> int:
+        """
+        Get the lines that can be full of one color after a move
+
+        Args:
+        - rotation: the rotated quarter * 2 + the direction
+
+        Return:
+        - A bitmask over the indices of SCORED_LINES
+        """
+        if rotation not in self.candidateLines:
+            mover, other = (self.black, self.white) if self.getTurn() == 1 else (self.white, self.black)
+            empty = FULL_MASK ^ (mover | other)
+            ret = 0
+            for i, line in enumerate(SCORED_LINE_PREIMAGES[rotation]):
+                # full of the other color, or of the mover but for the placed piece
+                if other & line == line or (not other & line and popCount(empty & line) <= 1):
+                    ret |= 1 << i
+            self.candidateLines[rotation] = ret
+        return self.candidateLines[rotation]
+
+    def getState(self) -> int:
+        return fromMasks(self.black, self.white)
+
+    def getTurn(self) -> int:
+        """
+        Get current turn
+
+        Return:
+        - 1: black
+        - 2: white
+        """
+        return popCount(self.black | self.white) % 2 + 1
+
+    def eval(self) -> int:
+        """
+        Evaluate the parent position
+        """
+        winnerColor = findWinner(self.black, self.white)
+        if winnerColor >= 0:
+            return terminalScore(winnerColor, self.getTurn())
+        score = self.linesScore + criticalScore(self.black, self.white)
+        return score if self.getTurn() == 1 else -score
+
+    def childMasks(self, move: int) -> tuple:
+        """
+        Get the occupancy masks after a move
+
+        Args:
+        - move: the move code, see gamenode.encodeMove
+
+        Return:
+        - A (black, white) pair
+        """
+        return playMove(self.black, self.white, move)
+
+    def evalMove(self, move: int) -> int:
+        """
+        Evaluate the position after a move from the parent score
+
+        Args:
+        - move: the move code, see gamenode.encodeMove
+
+        Return:
+        - The score Node.eval gives to the next state
+        """
+        return self.evalChild(move, *self.childMasks(move))
+
+    def evalChild(self, move: int, black: int, white: int) -> int:
+        """
+        Same as evalMove, with the occupancy masks after the move given
+        """
+        turn = 3 - self.getTurn()
+        winnerColor = findWinnerAfterMove(black, white, move >> 3, move >> 1 & 3)
+        if winnerColor >= 0:
+            return terminalScore(winnerColor, turn)
+        affected = self.activeLines | self.getCandidateLines(move & 7)
+        score, lineScores = self.linesScore, self.lineScores
+        while affected:
+            bit = affected & -affected
+            i = bit.bit_length() - 1
+            affected ^= bit
+            score += lineScore(i, black, white) - lineScores[i]
+        score += criticalScore(black, white)
+        return score if turn == 1 else -score
+
+    def nextMoves(self):
+        """
+        Lazily generate all possible moves with the scores of next states
+
+        Yield:
+        - (move, nextState, score) triples, moves leading to an already
+          generated state are skipped
+        """
+        for move, black, white in generateMaskMoves(self.black, self.white):
+            yield move, fromMasks(black, white), self.evalChild(move, black, white)
+
+
+if __name__ == "__main__":
+    evaluator = DeltaEvaluator(5115112716510)
+    print(evaluator.eval())
+    print(max(evaluator.nextMoves(), key=lambda x: x[2]))
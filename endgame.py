@@ -0,0 +1,189 @@
+from array import array
+from bitboard import *
+from transposition import EXACT, LOWER, UPPER
+
+
+# results for the player to move
+LOSS, DRAW, WIN = -1, 0, 1
+
+
+class SolverTable:
+    """
+    Compact fixed size table of solved positions.
+
+    An entry is the state and a byte holding the result and whether it is
+    exact or only a lower or upper bound. A new entry always replaces the
+    old one.
+    """
+
+    def __init__(self, sizeBits: int = 20) -> None:
+        """
+        Constructor
+
+        Args:
+        - sizeBits: the table holds 2 ** sizeBits entries
+        """
+        self.sizeBits = sizeBits
+        self.clear()
+
+    def clear(self):
+        """
+        Remove all entries
+        """
+        size = 1 << self.sizeBits
+        # state 0 is never solved, it marks empty entries
+        self.keys = array("Q", bytes(8 * size))
+        self.entries = array("b", bytes(size))
+
+    def index(self, state: int) -> int:
+        # multiplicative hashing, keeping the top bits of the 64-bit product
+        return (state * 0x9E3779B97F4A7C15 & 0xFFFFFFFFFFFFFFFF) >> (64 - self.sizeBits)
+
+    def lookup(self, state: int):
+        """
+        Look up a state
+
+        Return:
+        - A (result, bound) pair, None if the state is not stored
+        """
+        index = self.index(state)
+        if self.keys[index] == state:
+            entry = self.entries[index]
+            return entry % 3 - 1, entry // 3
+        return None
+
+    def store(self, state: int, result: int, bound: int):
+        """
+        Store a result for the player to move
+
+        Args:
+        - state: the solved state
+        - result: LOSS, DRAW or WIN
+        - bound: EXACT, LOWER or UPPER from transposition
+        """
+        index = self.index(state)
+        self.keys[index] = state
+        self.entries[index] = bound * 3 + result + 1
+
+
+class EndgameSolver:
+    """
+    Exact win/draw/loss solver for positions with few empty cells
+    """
+
+    def __init__(self, tableBits: int = 20) -> None:
+        """
+        Constructor
+
+        Args:
+        - tableBits: the table holds 2 ** tableBits entries, kept between
+          solves
+        """
+        self.table = SolverTable(tableBits)
+        self.nodes = 0
+        # called at every node, it may raise to abort the solve
+        self.checkBudget = None
+
+    def expand(self, black: int, white: int) -> tuple:
+        """
+        Play all moves of a non-terminal position
+
+        Return:
+        - A (result, moves) pair, where result is the best result among
+          the moves ending the game, LOSS if none does, and moves are the
+          (move, black, white) triples of the other moves, with moves
+          leading to an already generated position skipped. Moves stops
+          at the first winning move.
+        """
+        turn = popCount(black | white) % 2 + 1
+        result, moves = None, []
+        for move, nextBlack, nextWhite in generateMaskMoves(black, white):
+            winnerColor = findWinnerAfterMove(nextBlack, nextWhite, move >> 3, move >> 1 & 3)
+            if winnerColor == turn:
+                return WIN, [(move, nextBlack, nextWhite)]
+            elif winnerColor == 0:
+                result = DRAW
+            elif winnerColor < 0:
+                moves.append((move, nextBlack, nextWhite))
+            elif result is None:
+                result = LOSS
+        return LOSS if result is None else result, moves
+
+    def search(self, black: int, white: int, alpha: int = LOSS, beta: int = WIN) -> int:
+        """
+        Negamax search of a non-terminal position
+
+        Args:
+        - black, white: the occupancy masks
+        - alpha, beta: the search window
+
+        Return:
+        - The result for the player to move
+        """
+        self.nodes += 1
+        if self.checkBudget is not None:
+            self.checkBudget()
+        state = fromMasks(black, white)
+        entry = self.table.lookup(state)
+        if entry is not None:
+            result, bound = entry
+            if bound == EXACT or (bound == LOWER and result >= beta) or (bound == UPPER and result <= alpha):
+                return result
+        alphaOrig = alpha
+        value, moves = self.expand(black, white)
+        if value == WIN:
+            self.table.store(state, WIN, EXACT)
+            return WIN
+        alpha = max(alpha, value)
+        for _, nextBlack, nextWhite in moves:
+            if alpha >= beta:
+                break
+            value = max(value, -self.search(nextBlack, nextWhite, -beta, -alpha))
+            alpha = max(alpha, value)
+        if value <= alphaOrig:
+            bound = UPPER
+        elif value >= beta:
+            bound = LOWER
+        else:
+            bound = EXACT
+        self.table.store(state, value, bound)
+        return value
+
+    def solve(self, state: int, checkBudget=None) -> tuple:
+        """
+        Solve a non-terminal state
+
+        Args:
+        - state: the state to solve
+        - checkBudget: called at every node, raising from it aborts the
+          solve, the table only keeping results of finished subtrees
+
+        Return:
+        - A (result, nextState) pair, result being for the player to move
+          and nextState the first move reaching it
+        """
+        self.checkBudget = checkBudget
+        black, white = toMasks(state)
+        turn = popCount(black | white) % 2 + 1
+        ret, bestState = None, None
+        for _, nextBlack, nextWhite in generateMaskMoves(black, white):
+            winnerColor = findWinner(nextBlack, nextWhite)
+            if winnerColor == 0:
+                result = DRAW
+            elif winnerColor > 0:
+                result = WIN if winnerColor == turn else LOSS
+            else:
+                # only whether the move beats the best so far matters
+                result = -self.search(nextBlack, nextWhite, -WIN, -LOSS if ret is None else -ret)
+            if ret is None or result > ret:
+                ret, bestState = result, fromMasks(nextBlack, nextWhite)
+                if ret == WIN:
+                    break
+        return ret, bestState
+
+
+if __name__ == "__main__":
+    from time import time
+    start_time = time()
+    print(EndgameSolver().solve(73796261754762293))
+    print("--- %s seconds ---" % (time() - start_time))
@@ -0,0 +1,84 @@
+from collections import OrderedDict
+
+
+class EvalCache:
+    """
+    Bounded cache of static evaluations.
+
+    When full, the least recently used entry is evicted. Lookups count
+    hits and misses, so that the counters tell how many evaluations the
+    cache saved.
+    """
+
+    def __init__(self, capacity: int = 1 << 18) -> None:
+        """
+        Constructor
+
+        Args:
+        - capacity: the maximum number of entries
+        """
+        self.capacity = capacity
+        self.data = OrderedDict()
+        self.resetStats()
+
+    def resetStats(self):
+        """
+        Reset the hit, miss and eviction counters
+        """
+        self.hits, self.misses, self.evictions = 0, 0, 0
+
+    def getStats(self) -> dict:
+        """
+        Get the counters
+
+        Return:
+        - A dict with the hits, misses, evictions, size and hit rate
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self.data),
+            "hitRate": self.hits / lookups if lookups else 0.0
+        }
+
+    def get(self, key: int):
+        """
+        Look up a score, marking it as recently used
+
+        Return:
+        - The score, None if it is not cached
+        """
+        value = self.data.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.data.move_to_end(key)
+        return value
+
+    def put(self, key: int, value):
+        """
+        Cache a score, evicting the least recently used one if full
+        """
+        self.data[key] = value
+        self.data.move_to_end(key)
+        if len(self.data) > self.capacity:
+            self.data.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self.data.clear()
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+
+if __name__ == "__main__":
+    cache = EvalCache(2)
+    cache.put(1, 10)
+    cache.put(2, 20)
+    cache.get(1)
+    cache.put(3, 30)
+    print(cache.get(2), cache.get(1), cache.getStats())
@@ -1,4 +1,6 @@
 from data import *
+from tables import ROTATIONS, QUARTER_ROTATIONS, QUARTER_PIECES
+from bitboard import toMasks, findWinner, evaluateMasks, generateMoves
 
 
 def getDigit(a: int, i: int, basePow: list) -> int:
@@ -16,6 +18,116 @@ def getDigit(a: int, i: int, basePow: list) -> int:
     return a // basePow[i] % basePow[1]
 
 
+def encodeMove(quarter: int, cell: int, rotatedQuarter: int, direction: int) -> int:
+    """
+    Encode a move as an integer in range(288)
+
+    Args:
+    - quarter, cell: the filled cell
+    - rotatedQuarter: the rotated quarter
+    - direction: 0 for ROTATE_CW, 1 for ROTATE_CCW
+
+    Return:
+    - The move code
+    """
+    return ((9 * quarter + cell) * 4 + rotatedQuarter) * 2 + direction
+
+
+def decodeMove(move: int) -> tuple:
+    """
+    Decode a move code
+
+    Return:
+    - A (quarter, cell, rotatedQuarter, direction) tuple
+    """
+    move, direction = divmod(move, 2)
+    move, rotatedQuarter = divmod(move, 4)
+    quarter, cell = divmod(move, 9)
+    return quarter, cell, rotatedQuarter, direction
+
+
+def legalMove(state: int, move: int) -> bool:
+    """
+    Check if the cell filled by a move is empty
+    """
+    quarter, cell, _, _ = decodeMove(move)
+    return getDigit(getDigit(state, quarter, POW_QUARTERS), cell, POW_CELLS) == 0
+
+
+def applyMove(state: int, move: int) -> int:
+    """
+    Get the state after a move
+
+    Args:
+    - state: the state to move from
+    - move: the move code, see encodeMove
+
+    Return:
+    - The next state
+    """
+    quarter, cell, rotatedQuarter, direction = decodeMove(move)
+    state += turn(state) * POW_CELLS[cell] * POW_QUARTERS[quarter]
+    value = state // POW_QUARTERS[rotatedQuarter] % POW_QUARTERS[1]
+    return state + (QUARTER_ROTATIONS[direction][value] - value) * POW_QUARTERS[rotatedQuarter]
+
+
+def pieceCount(state: int) -> int:
+    """
+    Count the pieces of a state
+    """
+    ret = 0
+    for quarter in range(4):
+        state, value = divmod(state, POW_QUARTERS[1])
+        ret += QUARTER_PIECES[value]
+    return ret
+
+
+def turn(state: int) -> int:
+    """
+    Get the turn of a state
+
+    Return:
+    - 1: black
+    - 2: white
+    """
+    return pieceCount(state) % 2 + 1
+
+
+def terminal(state: int) -> int:
+    """
+    Check if the game ended
+
+    Return:
+    - -1: not ended
+    - 0: tie
+    - 1: black wins
+    - 2: white wins
+    """
+    return findWinner(*toMasks(state))
+
+
+def nextMoves(state: int):
+    """
+    Lazily generate all possible moves of a state, see
+    bitboard.generateMoves
+    """
+    return generateMoves(*toMasks(state))
+
+
+def children(state: int) -> list:
+    """
+    Get all possible next states of a state
+    """
+    return [nextState for _, nextState in generateMoves(*toMasks(state))]
+
+
+def evaluate(state: int) -> int:
+    """
+    Evaluate a state from the point of view of the player to move
+    """
+    return evaluateMasks(*toMasks(state))
+
+
 class Node:
     """
     Represent a state of the game
@@ -60,20 +172,14 @@ class Node:
         """
         Rotate a quarter
         """
-        for i, j in swapList:
-            vi, vj = self.getCell(quarter, i), self.getCell(quarter, j)
-            self.state += (vj - vi) * POW_CELLS[i] * POW_QUARTERS[quarter]
-            self.state += (vi - vj) * POW_CELLS[j] * POW_QUARTERS[quarter]
+        value = self.getQuarter(quarter)
+        self.state += (QUARTER_ROTATIONS[ROTATIONS.index(swapList)][value] - value) * POW_QUARTERS[quarter]
 
     def countEmptyCells(self) -> int:
         """
         Count empty cells
         """
-        ret = 0
-        for quarter in range(4):
-            for cell in range(9):
-                ret += self.getCell(quarter, cell) == 0
-        return ret
+        return 36 - pieceCount(self.state)
 
     def getEmptyCells(self) -> list:
         """
@@ -96,62 +202,19 @@ class Node:
         - 1: black wins
         - 2: white wins
         """
-
-        def sameColorLine(color) -> bool:
-            for line in LINES_5:
-                flag = True
-                for quarter, cell in line:
-                    if self.getCell(quarter, cell) != color:
-                        flag = False
-                        break
-                if flag:
-                    return True
-            return False
-
-        blackWon = sameColorLine(1)
-        whiteWon = sameColorLine(2)
-
-        if blackWon:
-            if whiteWon:
-                # game tied if both colors have 5-in-a-row
-                return 0
-            else:
-                # black won
-                return 1
-        else:
-            if whiteWon:
-                # white won
-                return 2
-            else:
-                if self.countEmptyCells() == 0:
-                    # game tied if players cannot move
-                    return 0
-                else:
-                    # game not ended
-                    return -1
+        return terminal(self.state)
 
     def possibleNextStates(self) -> list:
         """
         Get all possible next states
         """
-        ret = set()
-        emptyCells = self.getEmptyCells()
-        color = (36 - len(emptyCells)) % 2 + 1
-        # cache current state
-        cachedState = self.state
-        # iterate through all remaining cells
-        for q1, c1 in emptyCells:
-            for q2 in range(4):
-                for c2 in [ROTATE_CW, ROTATE_CCW]:
-                    # place a new piece
-                    self.state += color * POW_CELLS[c1] * POW_QUARTERS[q1]
-                    # rotate
-                    self.rotate(q2, c2)
-                    # add to result
-                    ret.add(self.getState())
-                    # revert
-                    self.setState(cachedState)
-        return list(ret)
+        return [nextState for _, nextState in self.nextMoves()]
+
+    def nextMoves(self):
+        """
+        Lazily generate all possible moves, see nextMoves
+        """
+        return nextMoves(self.state)
 
     def __repr__(self) -> str:
         ret = ""
@@ -175,11 +238,27 @@ class Node:
         - 1: black
         - 2: white
         """
-        return self.countEmptyCells() % 2 + 1
+        return turn(self.state)
 
     def fillCell(self, quarter, cell):
         self.state += self.getTurn() * POW_CELLS[cell] * POW_QUARTERS[quarter]
 
+    def makeMove(self, quarter, cell, rotatedQuarter, swapList) -> int:
+        """
+        Place a piece and rotate a quarter
+
+        Args:
+        - quarter, cell: the cell to fill
+        - rotatedQuarter: the quarter to rotate
+        - swapList: ROTATE_CW or ROTATE_CCW
+
+        Return:
+        - The terminal() value of the new state
+        """
+        self.fillCell(quarter, cell)
+        self.rotate(rotatedQuarter, swapList)
+        return self.terminal()
+
     def __hash__(self) -> int:
         return self.state
 
@@ -187,47 +266,7 @@ class Node:
         """
         Evaluation function
         """
-
-        def getScore(color):
-            winner = self.terminal()
-            if winner >= 0:
-                if winner == color:
-                    return WEIGHT_LINES_5
-                elif winner == 3 - color:
-                    return -WEIGHT_LINES_5
-                else:
-                    return 234
-
-            def analyzeLines(data, score):
-                sumScore = 0
-                for line, nullifiers in data:
-                    flag = True
-                    for q, c in line:
-                        if self.getCell(q, c) != color:
-                            flag = False
-                            break
-                    if flag:
-                        advantage = len(nullifiers)
-                        for q, c in nullifiers:
-                            if self.getCell(q, c) == color:
-                                advantage = 0
-                                break
-                            elif self.getCell(q, c) == 3 - color:
-                                advantage -= 1
-                        sumScore += score[advantage]
-                return sumScore
-            
-            def analyzeCriticalCells():
-                sumScore = 0
-                for i in range(2):
-                    for q, c in CRITICAL_CELLS[i]:
-                        if self.getCell(q, c) == color:
-                            sumScore += WEIGHT_CRITICAL_CELLS[i]
-                return sumScore
-            
-            return analyzeLines(LINES_3, WEIGHT_LINES_3) + analyzeLines(LINES_4, WEIGHT_LINES_4) + analyzeCriticalCells()
-
-        return getScore(self.getTurn()) - getScore(3 - self.getTurn())
+        return evaluate(self.state)
 
 
 if __name__ == "__main__":
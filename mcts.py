@@ -1,5 +1,13 @@
-from random import randint
-from gamenode import *
+import os
+import multiprocessing
+from random import Random
+from time import time
+from bitnode import *
+from gamenode import terminal, turn, nextMoves, applyMove
+from symmetry import canonical, uniqueMoves
+from threats import winningMoves, blockingMoves
+from playout import Playout, randomPolicy
+from batchplayout import BatchPlayout
 from math import sqrt, log
 
 
@@ -32,17 +40,42 @@ class VisitLog:
 
 class HistoryData:
     
-    def __init__(self, state) -> None:
+    def __init__(self, state, useSymmetry=False, moves=None) -> None:
         self.totalVisits = 0
         self.visitedMoves = dict()
-        self.unvisitedMoves = Node(state).possibleNextStates()
+        # generate children only when they are visited
+        self.unvisitedMoves = nextMoves(state)
+        if moves is not None:
+            # keep only the given move codes
+            moves = set(moves)
+            self.unvisitedMoves = (x for x in self.unvisitedMoves if x[0] in moves)
+        if useSymmetry:
+            self.unvisitedMoves = uniqueMoves(self.unvisitedMoves)
+        self.nextUnvisitedMove = next(self.unvisitedMoves, None)
+
+    def reuse(self, old, key) -> None:
+        # take over the logs of the moves visited in an old entry of the same state,
+        # matching next states by key, as the old entry may come from a symmetric twin
+        oldLogs = {key(nextState): log for nextState, log in old.visitedMoves.items()}
+        unvisitedMoves = []
+        while self.nextUnvisitedMove is not None:
+            log = oldLogs.get(key(self.nextUnvisitedMove[1]))
+            if log is None:
+                unvisitedMoves.append(self.nextUnvisitedMove)
+            else:
+                self.visitedMoves[self.nextUnvisitedMove[1]] = log
+                self.totalVisits += log.totalVisits()
+            self.nextUnvisitedMove = next(self.unvisitedMoves, None)
+        self.unvisitedMoves = iter(unvisitedMoves)
+        self.nextUnvisitedMove = next(self.unvisitedMoves, None)
     
     def haveUnvisitedMoves(self) -> bool:
-        return len(self.unvisitedMoves) > 0
+        return self.nextUnvisitedMove is not None
     
     def getUnvisitedMove(self) -> int:
-        # pop from unvisited list
-        move = self.unvisitedMoves.pop(-1)
+        # take from unvisited generator
+        move = self.nextUnvisitedMove[1]
+        self.nextUnvisitedMove = next(self.unvisitedMoves, None)
         # create new entry in visited dict
         self.visitedMoves[move] = VisitLog()
         # return move
@@ -72,85 +105,451 @@ class MCTS:
     
     # attributes
     REP = 1000 # times to repeat
+    REUSE_TREE = True # keep the subtree of the new root between searches
+    BATCH_ROLLOUTS = 0 # rollouts per leaf played at once with numpy, 0 to play 3 to 7 one by one
+    PROGRESS_INTERVAL = 0.5 # seconds between progress reports
 
-    def __init__(self) -> None:
+    def __init__(self, useSymmetry: bool = False, policy=randomPolicy, seed=None) -> None:
         """
         Constructor
+
+        Args:
+        - useSymmetry: key the tree by the canonical form of positions so
+          that symmetric twins share one entry
+        - policy: the playout policy, see playout.randomPolicy
+        - seed: the seed of the random generators, None for random ones
         """
+        self.useSymmetry = useSymmetry
+        self.rng = Random(seed)
+        self.playout = Playout(policy, self.rng.getrandbits(64))
+        self.batchPlayout = BatchPlayout(self.rng.getrandbits(64))
         self.history = dict()
         self.currentPath = list()
+        self.stopped = False
+
+    def key(self, state: int) -> int:
+        """
+        Get the tree key of a state
+        """
+        return canonical(state) if self.useSymmetry else state
     
     def traverse(self, state):
+        if terminal(state) >= 0:
+            # the game is over, rollouts from it give its result
+            return state
         self.currentPath.append(state)
-        if self.history[state].haveUnvisitedMoves():
-            return self.history[state].getUnvisitedMove()
-        nextState = self.history[state].getOptimalNextMove()
+        data = self.history[self.key(state)]
+        if data.haveUnvisitedMoves():
+            return data.getUnvisitedMove()
+        nextState = data.getOptimalNextMove()
         return self.traverse(nextState)
     
     def rollout(self, state):
-        currentNode = Node(state)
-        winner = currentNode.terminal()
-        if winner < 0:
-            a, b, c, d = randint(0, 3), randint(0, 8), randint(0, 3), randint(0, 1)
-            currentNode.fillCell(a, b)
-            currentNode.rotate(c, ROTATE_CW if d else ROTATE_CCW)
-            return self.rollout(currentNode.getState())
-        else:
-            return winner
+        return self.playout.run(state)
     
     def backpropagation(self, previousState, records):
         # get parent
         parentState = self.currentPath.pop(-1)
-        # update
+        # update, records are the loses, ties and wins of the player to move
+        # in previousState, so the wins, ties and loses of the one moving into it
         tempRecords = [records[2], records[1], records[0]]
-        self.history[parentState].update(previousState, tempRecords)
+        self.history[self.key(parentState)].update(previousState, records)
         # continue
         if len(self.currentPath) > 0:
             self.backpropagation(parentState, tempRecords)
     
-    def run(self, initialState: int):
+    def forcedMove(self, initialState: int) -> tuple:
         """
-        Run the engine
+        Find a winning move or a forced block
 
         Args:
-        - initialState: the state to start finding
+        - initialState: the state to move from
+
+        Return:
+        - A (nextState, blocks) pair, where nextState is the state after
+          the forced move, None if there is none, and blocks are the move
+          codes not losing at once, empty if all lose
+        """
+        black, white = toMasks(initialState)
+        wins = winningMoves(black, white)
+        if wins:
+            return applyMove(initialState, wins[0]), []
+        blocks = blockingMoves(black, white)
+        if len(blocks) == 1:
+            return applyMove(initialState, blocks[0]), blocks
+        return None, blocks
+
+    def start(self, initialState: int):
+        """
+        Start a new search, plays wins and forced blocks at once
+
+        Args:
+        - initialState: the state to move from
+
+        Return:
+        - The next state if the move is forced, else None and the root is
+          ready for search
         """
-        self.history.clear()
-        self.history[initialState] = HistoryData(initialState)
-        # repeat the process
-        for i in range(self.REP):
+        if not self.REUSE_TREE:
+            self.history.clear()
+        # play wins and forced blocks at once, search only the moves not losing at once
+        nextState, blocks = self.forcedMove(initialState)
+        if nextState is not None:
+            self.prune(nextState)
+            return nextState
+        rootData = HistoryData(initialState, self.useSymmetry, blocks or None)
+        if self.key(initialState) in self.history:
+            rootData.reuse(self.history[self.key(initialState)], self.key)
+        self.history[self.key(initialState)] = rootData
+        self.prune(initialState)
+        return None
+
+    def prune(self, state: int):
+        """
+        Remove the entries not reachable from a state
+        """
+        reachable = set()
+        keys = [self.key(state)] if self.key(state) in self.history else []
+        while keys:
+            key = keys.pop()
+            if key in reachable:
+                continue
+            reachable.add(key)
+            for nextState in self.history[key].visitedMoves:
+                if self.key(nextState) in self.history:
+                    keys.append(self.key(nextState))
+        # a new dict, so that the memory of the old one is freed
+        self.history = {key: data for key, data in self.history.items() if key in reachable}
+
+    def simulate(self, state: int) -> list:
+        """
+        Play the rollouts of a leaf
+
+        Return:
+        - The [loses, ties, wins] tallies for the player to move in state
+        """
+        if self.BATCH_ROLLOUTS:
+            return self.batchPlayout.run(state, self.BATCH_ROLLOUTS)
+        color = turn(state)
+        records = [0, 0, 0] # loses ties wins
+        for j in range(self.rng.randint(3, 7)):
+            winner = self.rollout(state)
+            if winner == 0:
+                records[1] += 1
+            elif winner == color:
+                records[2] += 1
+            else:
+                records[0] += 1
+        return records
+
+    def rootMoves(self, initialState: int) -> dict:
+        """
+        Get the statistics of the root moves
+
+        Return:
+        - The VisitLog of every visited next state
+        """
+        return self.history[self.key(initialState)].visitedMoves
+
+    def search(self, initialState: int, iterations: int):
+        """
+        Grow the tree of a started search
+
+        Args:
+        - initialState: the root state
+        - iterations: the number of iterations to run
+        """
+        for i in range(iterations):
             # selection
             unvisitedState = self.traverse(initialState)
             # expansion
-            self.history[unvisitedState] = HistoryData(unvisitedState)
-            turn = Node(unvisitedState).getTurn()
+            if self.key(unvisitedState) not in self.history:
+                self.history[self.key(unvisitedState)] = HistoryData(unvisitedState, self.useSymmetry)
             # simulation
-            records = [0, 0, 0] # loses ties wins
-            for j in range(randint(3, 7)):
-                winner = self.rollout(unvisitedState)
-                if winner == 0:
-                    records[1] += 1
-                elif winner == turn:
-                    records[2] += 1
-                else:
-                    records[0] += 1
+            records = self.simulate(unvisitedState)
             # backpropagation
             self.backpropagation(unvisitedState, records)
-        # choose best move
-        bestValue, bestMove = -oo, None
-        for move in self.history[initialState].visitedMoves:
-            currentScore = self.history[initialState].visitedMoves[move].getScore()
-            if bestValue < currentScore:
-                bestValue, bestMove = currentScore, move
-        return bestMove
+
+    def stop(self):
+        """
+        Stop the running search, it returns the best move found so far
+        """
+        self.stopped = True
+
+    def progress(self, initialState: int, iterations: int, elapsed: float) -> dict:
+        """
+        Report on the running search
+
+        Args:
+        - initialState: the root state
+        - iterations: the iterations run so far
+        - elapsed: the seconds since the search started
+
+        Return:
+        - A dict with the best next state so far, the iterations, the
+          iterations per second and the visits of every visited next state
+        """
+        visitedMoves = self.rootMoves(initialState)
+        return {
+            "bestMove": bestMove(visitedMoves),
+            "iterations": iterations,
+            "iterationsPerSecond": iterations / elapsed if elapsed else 0.0,
+            "visits": {move: log.totalVisits() for move, log in visitedMoves.items()}
+        }
+
+    def searchProgress(self, initialState: int, timeLimit: float = None, iterations: int = None):
+        """
+        Search within a budget, reporting on the way. At least one
+        iteration runs, even if the search is stopped at once.
+
+        Args:
+        - initialState: the state to start finding
+        - timeLimit: the thinking time in seconds, None for no limit
+        - iterations: the number of iterations, None for no limit, REP if
+          there is no time limit either
+
+        Yield:
+        - Progress reports every PROGRESS_INTERVAL seconds, then a final
+          one whose bestMove is the chosen next state, see progress
+        """
+        self.stopped = False
+        startTime = time()
+        nextState = self.start(initialState)
+        if nextState is not None:
+            yield {"bestMove": nextState, "iterations": 0, "iterationsPerSecond": 0.0, "visits": {nextState: 0}}
+            return
+        if timeLimit is None and iterations is None:
+            iterations = self.REP
+        deadline = startTime + timeLimit if timeLimit is not None else None
+        done, lastReport = 0, startTime
+        while True:
+            self.search(initialState, 1)
+            done += 1
+            now = time()
+            if self.stopped or (iterations is not None and done >= iterations) or (deadline is not None and now >= deadline):
+                break
+            if now - lastReport >= self.PROGRESS_INTERVAL:
+                lastReport = now
+                yield self.progress(initialState, done, now - startTime)
+        yield self.progress(initialState, done, time() - startTime)
+
+    def run(self, initialState: int, timeLimit: float = None, iterations: int = None, callback=None):
+        """
+        Run the engine
+
+        Args:
+        - initialState: the state to start finding
+        - timeLimit, iterations: the budget, see searchProgress
+        - callback: called with every progress report, see searchProgress
+
+        Return:
+        - The best next state
+        """
+        for report in self.searchProgress(initialState, timeLimit, iterations):
+            if callback is not None:
+                callback(report)
+        return report["bestMove"]
+
+    def ponder(self, state: int):
+        """
+        Search a state until stopped, the tree is then reused by the
+        search of the reply. Unlike run, it does not clear stopped.
+
+        Args:
+        - state: the state the opponent moves from
+        """
+        if self.start(state) is not None:
+            return
+        while not self.stopped:
+            self.search(state, 1)
+
+
+def bestMove(visitedMoves: dict):
+    """
+    Choose the move with the best score
+
+    Args:
+    - visitedMoves: the VisitLog of every visited next state
+
+    Return:
+    - The next state, the first one on ties
+    """
+    bestValue, ret = -oo, None
+    for move in visitedMoves:
+        currentScore = visitedMoves[move].getScore()
+        if bestValue < currentScore:
+            bestValue, ret = currentScore, move
+    return ret
+
+
+def searchWorker(connection, seed, useSymmetry: bool, policy, batchRollouts: int):
+    """
+    Serve the searches of a ParallelMCTS in a worker process.
+
+    The worker receives (state, iterations, merged) tasks, where merged is
+    None to start a new search or the merged root statistics of all
+    workers to continue it, and replies with the root statistics of its
+    own playouts. The tree is kept between the tasks of a search. A None
+    task or a closed pipe stops the worker.
+
+    Args:
+    - connection: the worker end of a pipe
+    - seed, useSymmetry, policy: see MCTS
+    - batchRollouts: see MCTS.BATCH_ROLLOUTS
+    """
+    engine = MCTS(useSymmetry, policy, seed)
+    engine.BATCH_ROLLOUTS = batchRollouts
+    # root statistics of the other workers, included in the tree at sharedKey
+    shared, sharedKey = dict(), None
+    while True:
+        try:
+            task = connection.recv()
+        except EOFError:
+            # the engine was dropped without closing
+            break
+        if task is None:
+            break
+        state, iterations, merged = task
+        rootData = None if merged is None else engine.history.get(engine.key(state))
+        if rootData is None:
+            # take the visits of the other workers out of the old root, as
+            # the new search may reuse it
+            oldRoot = engine.history.get(sharedKey)
+            if oldRoot is not None:
+                for move, other in shared.items():
+                    log = oldRoot.visitedMoves[move]
+                    log.wins, log.ties, log.loses = log.wins - other.wins, log.ties - other.ties, log.loses - other.loses
+                oldRoot.totalVisits = sum(log.totalVisits() for log in oldRoot.visitedMoves.values())
+            shared.clear()
+            sharedKey = engine.key(state)
+            if engine.start(state) is not None:
+                connection.send(dict())
+                continue
+            rootData = engine.history[engine.key(state)]
+        else:
+            for move, log in rootData.visitedMoves.items():
+                if move in merged:
+                    other = shared.get(move, VisitLog())
+                    total = merged[move]
+                    shared[move] = VisitLog(total.wins - log.wins + other.wins, total.ties - log.ties + other.ties, total.loses - log.loses + other.loses)
+                    log.wins, log.ties, log.loses = total.wins, total.ties, total.loses
+            rootData.totalVisits = sum(log.totalVisits() for log in rootData.visitedMoves.values())
+        engine.search(state, iterations)
+        own = dict()
+        for move, log in rootData.visitedMoves.items():
+            other = shared.get(move, VisitLog())
+            own[move] = VisitLog(log.wins - other.wins, log.ties - other.ties, log.loses - other.loses)
+        connection.send(own)
+
+
+class ParallelMCTS(MCTS):
+    """
+    Root parallel MCTS engine.
+
+    Every worker process grows its own tree from the root with its own
+    seed, and the visits of the root moves are summed up. The workers can
+    also swap their root statistics every few iterations, so that they
+    spend their playouts on the moves best for all of them. For fixed
+    seeds, the result does not depend on the timing of the workers.
+    """
+
+    # attributes
+    ROUND = 100 # iterations of the workers between budget checks without merges
+
+    def __init__(self, workers: int = None, useSymmetry: bool = False, policy=randomPolicy, seeds: list = None, mergeInterval: int = None) -> None:
+        """
+        Constructor
+
+        Args:
+        - workers: the number of processes, len(seeds) if seeds are
+          given, else all cores
+        - useSymmetry, policy: see MCTS
+        - seeds: the seed of every worker, random seeds if None
+        - mergeInterval: the iterations between merges of the root
+          statistics, None to merge only at the end
+        """
+        super().__init__(useSymmetry, policy)
+        if seeds is None:
+            seeds = [self.rng.getrandbits(64) for i in range(workers or os.cpu_count())]
+        self.seeds = list(seeds)
+        self.policy = policy
+        self.mergeInterval = mergeInterval
+        self.visitedMoves = dict()
+        # started with the first search
+        self.processes, self.connections = [], []
+
+    def close(self):
+        """
+        Stop the worker processes
+        """
+        for connection in self.connections:
+            connection.send(None)
+        for process in self.processes:
+            process.join()
+        self.processes, self.connections = [], []
+
+    def ponder(self, state: int):
+        """
+        Do nothing, the trees are in the workers
+        """
+
+    def searchProgress(self, initialState: int, timeLimit: float = None, iterations: int = None):
+        """
+        Run the workers and merge their root statistics, see MCTS. The
+        budget is checked every mergeInterval or ROUND iterations of the
+        workers, and iterations counts the iterations of every worker.
+        """
+        self.stopped = False
+        startTime = time()
+        nextState = self.start(initialState)
+        if nextState is not None:
+            yield {"bestMove": nextState, "iterations": 0, "iterationsPerSecond": 0.0, "visits": {nextState: 0}}
+            return
+        if not self.processes:
+            # spawn so that forking does not copy the threads of the gui
+            context = multiprocessing.get_context("spawn")
+            for seed in self.seeds:
+                connection, workerConnection = context.Pipe()
+                process = context.Process(target=searchWorker, args=(workerConnection, seed, self.useSymmetry, self.policy, self.BATCH_ROLLOUTS), daemon=True)
+                process.start()
+                self.processes.append(process)
+                self.connections.append(connection)
+        if timeLimit is None and iterations is None:
+            iterations = self.REP
+        deadline = startTime + timeLimit if timeLimit is not None else None
+        interval = self.mergeInterval or (self.ROUND if deadline is not None or iterations is None else iterations)
+        merged, done = None, 0
+        while True:
+            roundIterations = interval if iterations is None else min(interval, iterations - done)
+            # merged None starts a new search, an empty dict merges nothing
+            task = (initialState, roundIterations, merged if merged is None or self.mergeInterval else dict())
+            for connection in self.connections:
+                connection.send(task)
+            # merge in worker order so that the sums do not depend on timing
+            results = [connection.recv() for connection in self.connections]
+            merged = dict()
+            for result in results:
+                for move, log in result.items():
+                    merged.setdefault(move, VisitLog()).update((log.wins, log.ties, log.loses))
+            done += roundIterations
+            self.visitedMoves = merged
+            if self.stopped or (iterations is not None and done >= iterations) or (deadline is not None and time() >= deadline):
+                break
+            yield self.progress(initialState, done * len(self.connections), time() - startTime)
+        yield self.progress(initialState, done * len(self.connections), time() - startTime)
+
+    def rootMoves(self, initialState: int) -> dict:
+        """
+        Get the merged statistics of the root moves, see MCTS.rootMoves
+        """
+        return self.visitedMoves
 
 
 if __name__ == "__main__":
-    import time
     m = MCTS()
     startState = 5115112716510
-    print(Node(startState))
-    start_time = time.time()
-    nextMove = m.run(startState)
-    print(Node(nextMove))
-    print("--- %s seconds ---" % (time.time() - start_time))
\ No newline at end of file
+    print(BitNode(startState))
+    start_time = time()
+    nextMove = m.run(startState, timeLimit=2, callback=lambda report: print(report["iterations"], "iterations", report["iterationsPerSecond"], "per second"))
+    print(BitNode(nextMove))
+    print("--- %s seconds ---" % (time() - start_time))
@@ -0,0 +1,207 @@
+from array import array
+from math import sqrt, log
+from bitboard import toMasks, findWinner
+from gamenode import nextMoves
+from symmetry import uniqueMoves
+from playout import randomPolicy
+from mcts import MCTS, VisitLog, oo
+
+
+class NodePool:
+    """
+    Tree nodes stored in typed arrays.
+
+    Node i is entry i of every array. All children of a node are
+    allocated together when it is expanded, so a node only keeps the
+    index of its first child and their count. The arrays grow by CHUNK
+    nodes at a time.
+    """
+
+    # attributes
+    CHUNK = 1 << 16 # nodes added when the pool is full
+
+    def __init__(self) -> None:
+        self.clear()
+
+    def clear(self):
+        """
+        Remove all nodes and free the arrays
+        """
+        self.states = array("Q")
+        # the move into the node, see gamenode.encodeMove
+        self.moves = array("h")
+        # outcomes for the player moving into the node
+        self.wins = array("i")
+        self.ties = array("i")
+        self.loses = array("i")
+        # 0 until the node is expanded, the root is never a child
+        self.firstChildren = array("i")
+        self.childCounts = array("h")
+        # children are visited for the first time in order
+        self.visitedChildren = array("h")
+        self.size = 0
+
+    def arrays(self) -> list:
+        return [self.states, self.moves, self.wins, self.ties, self.loses, self.firstChildren, self.childCounts, self.visitedChildren]
+
+    def allocate(self, count: int) -> int:
+        """
+        Allocate zeroed nodes
+
+        Args:
+        - count: the number of nodes
+
+        Return:
+        - The index of the first node
+        """
+        while self.size + count > len(self.states):
+            for values in self.arrays():
+                values.frombytes(bytes(self.CHUNK * values.itemsize))
+        ret = self.size
+        self.size += count
+        return ret
+
+    def memory(self) -> int:
+        """
+        Get the size of the arrays in bytes
+        """
+        return sum(len(values) * values.itemsize for values in self.arrays())
+
+    def __len__(self) -> int:
+        return self.size
+
+
+class ArrayMCTS(MCTS):
+    """
+    Monte Carlo Tree Search engine keeping its tree in a NodePool.
+
+    It searches like MCTS, but a node takes a few dozen bytes instead of
+    a dict entry and objects. The tree is a plain tree, so transpositions
+    get their own nodes, and it is not reused between searches.
+    """
+
+    def __init__(self, useSymmetry: bool = False, policy=randomPolicy, seed=None) -> None:
+        """
+        Constructor
+
+        Args:
+        - useSymmetry: skip the moves into a symmetric twin of an earlier
+          child
+        - policy, seed: see MCTS
+        """
+        super().__init__(useSymmetry, policy, seed)
+        self.pool = NodePool()
+
+    def start(self, initialState: int):
+        """
+        Start a new search, see MCTS.start
+        """
+        self.pool.clear()
+        nextState, blocks = self.forcedMove(initialState)
+        if nextState is not None:
+            return nextState
+        root = self.pool.allocate(1)
+        self.pool.states[root] = initialState
+        self.expand(root, blocks or None)
+        return None
+
+    def ponder(self, state: int):
+        """
+        Do nothing, the tree is not reused
+        """
+
+    def expand(self, node: int, moves: list = None):
+        """
+        Allocate the children of a node
+
+        Args:
+        - node: the node index
+        - moves: the move codes to keep, all if None
+        """
+        pool = self.pool
+        state = pool.states[node]
+        children = []
+        if findWinner(*toMasks(state)) < 0:
+            children = nextMoves(state)
+            if moves is not None:
+                moves = set(moves)
+                children = (x for x in children if x[0] in moves)
+            if self.useSymmetry:
+                children = uniqueMoves(children)
+            children = list(children)
+        first = pool.allocate(len(children))
+        for i, (move, nextState) in enumerate(children):
+            pool.moves[first + i] = move
+            pool.states[first + i] = nextState
+        pool.firstChildren[node] = first
+        pool.childCounts[node] = len(children)
+
+    def select(self, node: int) -> int:
+        """
+        Choose the child with the best UCT value, all children being visited
+        """
+        pool = self.pool
+        first = pool.firstChildren[node]
+        children = range(first, first + pool.childCounts[node])
+        # like HistoryData, count the visits through the children only
+        logVisits = 2.0 * log(sum(pool.wins[child] + pool.ties[child] + pool.loses[child] for child in children))
+        scoreLose, scoreTie, scoreWin = VisitLog.SCORES
+        bestValue, ret = -oo, None
+        for child in children:
+            wins, ties, loses = pool.wins[child], pool.ties[child], pool.loses[child]
+            visits = wins + ties + loses
+            uct = (scoreLose * loses + scoreTie * ties + scoreWin * wins) / visits + sqrt(logVisits / visits)
+            if uct > bestValue:
+                bestValue, ret = uct, child
+        return ret
+
+    def search(self, initialState: int, iterations: int):
+        """
+        Grow the tree of a started search, see MCTS.search
+        """
+        pool = self.pool
+        for i in range(iterations):
+            # selection
+            node, path = 0, [0]
+            while True:
+                if pool.firstChildren[node] == 0:
+                    self.expand(node)
+                count = pool.childCounts[node]
+                if count == 0:
+                    break
+                visited = pool.visitedChildren[node]
+                if visited < count:
+                    # expansion
+                    pool.visitedChildren[node] = visited + 1
+                    node = pool.firstChildren[node] + visited
+                    path.append(node)
+                    break
+                node = self.select(node)
+                path.append(node)
+            # simulation
+            loses, ties, wins = self.simulate(pool.states[node])
+            # backpropagation, flipping to the player moving into each node
+            for node in reversed(path):
+                loses, wins = wins, loses
+                pool.wins[node] += wins
+                pool.ties[node] += ties
+                pool.loses[node] += loses
+
+    def rootMoves(self, initialState: int) -> dict:
+        """
+        Get the statistics of the root moves, see MCTS.rootMoves
+        """
+        pool = self.pool
+        first = pool.firstChildren[0]
+        return {
+            pool.states[child]: VisitLog(pool.wins[child], pool.ties[child], pool.loses[child])
+            for child in range(first, first + pool.visitedChildren[0])
+        }
+
+
+if __name__ == "__main__":
+    from time import time
+    m = ArrayMCTS()
+    start_time = time()
+    print(m.run(5115112716510), len(m.pool), m.pool.memory())
+    print("--- %s seconds ---" % (time() - start_time))
@@ -1,9 +1,26 @@
-from gamenode import *
+import os
+import multiprocessing
+from bitnode import *
+from time import time
+from gamenode import terminal, turn, pieceCount, legalMove, applyMove, nextMoves, evaluate
+from batcheval import evaluateBatch
+from deltaeval import DeltaEvaluator
+from symmetry import canonical
+from transposition import *
+from endgame import EndgameSolver, LOSS
+from threats import iterWinningMoves, winningMoves, blockingMoves
+from evalcache import EvalCache
 
 
 oo = 1000000000000000000
 
 
+class SearchTimeout(Exception):
+    """
+    Raised inside the search when the time or node budget is used up
+    """
+
+
 class Minimax:
     """
     Minimax engine
@@ -12,86 +29,579 @@ class Minimax:
     MAX_DEPTH = 4
     GOOD_MOVES_LIMIT = 19
     BETTER_MOVES_LIMIT = 7
+    BATCH_EVAL = True # evaluate children with numpy, else incrementally from the parent
+    ORDER_BY_EVAL = False # evaluate and sort all children before trying the table move and killers
+    KILLER_MOVES = 2 # killer moves kept per ply
+    PVS = True # search all children but the first with a null window
+    ASPIRATION_WINDOW = 500 # half width of the root window around the previous score, 0 for a full window
+    SOLVE_EMPTY_CELLS = 7 # solve positions with at most this many empty cells exactly
+    SOLVE_BUDGET_SHARE = 0.5 # part of the time and node budget the solver may use before the search takes over
+    SOLVE_NODE_LIMIT = 5000 # solver nodes allowed when run() gets no budget
 
-    def __init__(self) -> None:
+    def __init__(self, useSymmetry: bool = False, tableBits: int = 20, cacheSize: int = 1 << 18) -> None:
         """
         Constructor
 
         Args:
-        - maxDepth: the maximum layers to explore
+        - useSymmetry: key the tables by the canonical form of positions so
+          that symmetric twins share one entry
+        - tableBits: the transposition table holds 2 ** tableBits entries
+        - cacheSize: the number of static scores kept
+        """
+        self.useSymmetry = useSymmetry
+        # kept between runs
+        self.table = TranspositionTable(tableBits)
+        # built by the first solveEndgame, the workers of ParallelMinimax never need it
+        self.solver = None
+        # counters are reset by every run()
+        self.cacheEval = EvalCache(cacheSize)
+        # moves that caused cutoffs, per ply
+        self.killers = [[NO_MOVE] * self.KILLER_MOVES for _ in range(37)]
+        # cutoff scores of every move code, kept between runs
+        self.moveHistory = [0] * 288
+        self.maxDepth = self.MAX_DEPTH
+        self.deadline, self.nodeLimit, self.nodes = None, None, 0
+        # set by stop() from another thread
+        self.stopped = False
+        # best move of the root found by the last traversal
+        self.rootMove = NO_MOVE
+        # keys of the root moves to search, None for all
+        self.rootKeys = None
+        # depth and value of the last completed iteration
+        self.depth, self.value = 0, 0
+
+    def key(self, state: int) -> int:
+        """
+        Get the table key of a state
+        """
+        return canonical(state) if self.useSymmetry else state
+
+    def expand(self, state: int) -> dict:
+        """
+        Map the table keys of all next states to (move, nextState, score)
+        triples, score being the static score of the next state
+        """
+        ret = dict()
+        if self.BATCH_EVAL:
+            moves = dict()
+            for move, nextState in nextMoves(state):
+                moves.setdefault(self.key(nextState), (move, nextState))
+            scores = {key: self.cacheEval.get(key) for key in moves}
+            # evaluate all new children in one batch
+            newStates = [key for key, score in scores.items() if score is None]
+            if newStates:
+                for key, score in zip(newStates, evaluateBatch(newStates).tolist()):
+                    scores[key] = score
+                    self.cacheEval.put(key, score)
+            for key, (move, nextState) in moves.items():
+                ret[key] = (move, nextState, scores[key])
+        else:
+            for move, nextState, score in DeltaEvaluator(state).nextMoves():
+                key = self.key(nextState)
+                if key not in ret:
+                    ret[key] = (move, nextState, score)
+                    self.cacheEval.put(key, score)
+        return ret
+
+    def preeval(self, key: int) -> int:
+        """
+        Get the static score of a state, caching it
+        """
+        ret = self.cacheEval.get(key)
+        if ret is None:
+            ret = evaluate(key)
+            self.cacheEval.put(key, ret)
+        return ret
+
+    def orderMoves(self, state: int, tableMove: int = NO_MOVE) -> tuple:
+        """
+        Order the next states of a state, best first
+
+        Args:
+        - state: the state to move from
+        - tableMove: the best move stored in the transposition table
+
+        Return:
+        - A (keyedStates, nextKeys) pair, keyedStates as returned by expand
+          and nextKeys its keys in search order: the state reached by
+          tableMove, then the rest by static score and cutoff history
+        """
+        keyedStates = self.expand(state)
+        # the scores are for the opponent, so the lowest goes first
+        nextKeys = sorted(keyedStates, key=lambda x: (keyedStates[x][2], -self.moveHistory[keyedStates[x][0]]))
+        for i, nextKey in enumerate(nextKeys):
+            if keyedStates[nextKey][0] == tableMove:
+                nextKeys.insert(0, nextKeys.pop(i))
+                break
+        return keyedStates, nextKeys
+
+    def searchOrder(self, state: int, depth: int, tableMove: int = NO_MOVE):
+        """
+        Lazily generate the next states of a state in search order
+
+        The table move and the killer moves of the ply are tried before
+        generating and evaluating the other children, which is skipped
+        when one of them causes a cutoff.
+
+        Args:
+        - state: the state to move from
+        - depth: the distance from the root
+        - tableMove: the best move stored in the transposition table
+
+        Yield:
+        - (move, nextKey) pairs, leaving out the root moves not in rootKeys
+        """
+        allowed = self.rootKeys if depth == 0 else None
+        if self.ORDER_BY_EVAL:
+            keyedStates, nextKeys = self.orderMoves(state, tableMove)
+            for nextKey in nextKeys:
+                if allowed is None or nextKey in allowed:
+                    yield keyedStates[nextKey][0], nextKey
+            return
+        tried = set()
+        for move in [tableMove] + self.killers[depth]:
+            if move != NO_MOVE and legalMove(state, move):
+                nextKey = self.key(applyMove(state, move))
+                if nextKey not in tried and (allowed is None or nextKey in allowed):
+                    tried.add(nextKey)
+                    yield move, nextKey
+        keyedStates, nextKeys = self.orderMoves(state)
+        for nextKey in nextKeys:
+            if nextKey not in tried and (allowed is None or nextKey in allowed):
+                yield keyedStates[nextKey][0], nextKey
+
+    def addCutoff(self, move: int, depth: int, draft: int):
+        """
+        Record a move causing a beta cutoff in the killers and the history
         """
-        self.history = dict()
-        self.cacheEval = dict()
-    
-    def traverse(self, state: int, alpha=-oo, beta=oo, depth=0):
-        # return if visited
-        if state in self.history:
-            return self.history[state]
+        killers = self.killers[depth]
+        if move not in killers:
+            killers.insert(0, move)
+            killers.pop()
+        self.moveHistory[move] += draft * draft
+
+    def stop(self):
+        """
+        Make the running search return as if its budget was used up, may
+        be called from another thread
+        """
+        self.stopped = True
+
+    def checkBudget(self):
+        """
+        Count a visited node and stop the search if the budget is used up
+        """
+        self.nodes += 1
+        if self.stopped:
+            raise SearchTimeout()
+        if self.nodeLimit is not None and self.nodes > self.nodeLimit:
+            raise SearchTimeout()
+        if self.deadline is not None and time() >= self.deadline:
+            raise SearchTimeout()
+
+    def traverse(self, state: int, alpha=-oo, beta=oo, depth=0) -> int:
+        """
+        Negamax search with alpha-beta pruning
+
+        Args:
+        - state: the state to search
+        - alpha, beta: the search window, for the player to move
+        - depth: the distance from the root
+
+        Return:
+        - The value of the state for the player to move
+        """
+        self.checkBudget()
+        key = self.key(state)
+        tableKey = zobristKey(key)
+        draft = self.maxDepth - depth
+
+        # return if searched deep enough, the root always needs its move
+        entry = self.table.lookup(tableKey)
+        tableMove = NO_MOVE
+        if entry is not None:
+            value, entryDraft, bound, tableMove = entry
+            if depth > 0 and entryDraft >= draft:
+                if bound == EXACT or (bound == LOWER and value >= beta) or (bound == UPPER and value <= alpha):
+                    return value
 
         # check terminality
-        winner = Node(state).terminal()
-        if winner == 0:
-            self.history[state] = 567
-            return self.history[state]
-        elif winner >= 0:
-            if winner == Node(state).getTurn():
-                self.history[state] = oo
+        winner = terminal(state)
+        if winner >= 0:
+            if winner == 0:
+                value = 0
+            elif winner == turn(state):
+                value = oo
             else:
-                self.history[state] = -oo
-            return self.history[state]
-        
-        def preeval(x):
-            if x not in self.cacheEval:
-                self.cacheEval[x] = Node(x).eval()
-            return self.cacheEval[x]
-        
+                value = -oo
+            self.table.store(tableKey, value, DRAFT_INFINITE, EXACT, NO_MOVE)
+            return value
+
         # return if reached max depth
-        if depth >= self.MAX_DEPTH:
-            self.history[state] = preeval(state)
-            return self.history[state]
-        
-        # consider only some best next moves
-        nextStates = Node(state).possibleNextStates()
-
-        nextStates.sort(key=preeval)
-        goodStates = nextStates[:self.GOOD_MOVES_LIMIT]
-        for i in nextStates[self.GOOD_MOVES_LIMIT:]:
-            self.history[i] = preeval(i)
-        
-        if depth % 2 == 0:
-            value = -oo
-            for i in range(len(goodStates)):
-                if alpha < beta:
-                    value = max(value, self.traverse(goodStates[i], alpha, beta, depth + 1 if i < self.BETTER_MOVES_LIMIT else depth + 2))
-                    alpha = max(alpha, value)
-            self.history[state] = value
+        if draft <= 0:
+            return self.preeval(key)
+
+        # a move winning at once needs no search, worth checking above the frontier
+        if draft >= 2 and next(iterWinningMoves(*toMasks(state)), None) is not None:
+            self.table.store(tableKey, oo, DRAFT_INFINITE, EXACT, NO_MOVE)
+            return oo
+
+        # consider only some best next moves, searching the keys themselves
+        alphaOrig = alpha
+        value, bestMove = -oo, NO_MOVE
+        for i, (move, nextKey) in enumerate(self.searchOrder(state, depth, tableMove)):
+            nextDepth = depth + 1 if i < self.BETTER_MOVES_LIMIT else depth + 2
+            # prove the move worse than the best so far, searching again if it is not
+            if i > 0 and self.PVS and abs(alpha) < oo:
+                nextValue = -self.traverse(nextKey, -alpha - 1, -alpha, nextDepth)
+                if alpha < nextValue < beta:
+                    nextValue = -self.traverse(nextKey, -beta, -alpha, nextDepth)
+            else:
+                nextValue = -self.traverse(nextKey, -beta, -alpha, nextDepth)
+            if bestMove == NO_MOVE or nextValue > value:
+                value, bestMove = nextValue, move
+            alpha = max(alpha, value)
+            if alpha >= beta or i + 1 >= self.GOOD_MOVES_LIMIT:
+                break
+
+        if value <= alphaOrig:
+            bound = UPPER
+        elif value >= beta:
+            bound = LOWER
+            self.addCutoff(bestMove, depth, draft)
         else:
-            value = oo
-            for i in range(len(goodStates)):
-                if alpha < beta:
-                    value = min(value, self.traverse(goodStates[i], alpha, beta, depth + 1 if i < self.BETTER_MOVES_LIMIT else depth + 2))
-                    beta = min(beta, value)
-            self.history[state] = value
-        
-        if depth > 0:
-            return value
+            bound = EXACT
+        self.table.store(tableKey, value, draft, bound, bestMove)
+        if depth == 0:
+            self.rootMove = bestMove
+        return value
+
+    def aspirationSearch(self, state: int, guess) -> int:
+        """
+        Search the root with a window around a guess of its value,
+        widening the window and searching again while the value falls
+        outside
+
+        Args:
+        - state: the root state
+        - guess: the value of the previous iteration
+
+        Return:
+        - The value of the state for the player to move
+        """
+        window = self.ASPIRATION_WINDOW
+        alpha, beta = max(guess - window, -oo), min(guess + window, oo)
+        while True:
+            value = self.traverse(state, alpha, beta)
+            failLow, failHigh = value <= alpha and alpha > -oo, value >= beta and beta < oo
+            if not failLow and not failHigh:
+                return value
+            window *= 4
+            # a value at the scale of won games is not reached by widening
+            alpha = -oo if failLow and value <= -WEIGHT_LINES_5 else max(min(alpha, guess - window), -oo)
+            beta = oo if failHigh and value >= WEIGHT_LINES_5 else min(max(beta, guess + window), oo)
+
+    def solveEndgame(self, state: int, timeLimit: float = None, nodeLimit: int = None):
+        """
+        Solve a state exactly if it has few enough empty cells, within
+        SOLVE_BUDGET_SHARE of the budget, or SOLVE_NODE_LIMIT nodes
+        without a budget, and until stop() is called
+
+        Args:
+        - state: the state to solve
+        - timeLimit: the thinking time in seconds, None for no limit
+        - nodeLimit: the number of nodes to visit, None for no limit
+
+        Return:
+        - The next state keeping the best result, None if the state has
+          too many empty cells, is lost or could not be solved in time,
+          these states being left to the heuristic search, which plays
+          on for an opponent's mistake
+        """
+        emptyCells = 36 - pieceCount(state)
+        if emptyCells > self.SOLVE_EMPTY_CELLS:
+            return None
+        self.deadline = time() + timeLimit * self.SOLVE_BUDGET_SHARE if timeLimit is not None else None
+        if nodeLimit is not None:
+            self.nodeLimit = int(nodeLimit * self.SOLVE_BUDGET_SHARE)
         else:
-            bestValue, bestState = oo * 10, None
-            for nextState in nextStates:
-                if nextState in self.history and bestValue > self.history[nextState]:
-                    bestValue, bestState = self.history[nextState], nextState
-            return bestState
-    
-    def run(self, state):
-        self.history.clear()
-        return self.traverse(state)
+            self.nodeLimit = self.SOLVE_NODE_LIMIT if timeLimit is None else None
+        if self.solver is None:
+            self.solver = EndgameSolver()
+        try:
+            result, nextState = self.solver.solve(state, self.checkBudget)
+        except SearchTimeout:
+            return None
+        if result == LOSS:
+            return None
+        self.depth, self.value = emptyCells, result * oo
+        return nextState
+
+    def scanThreats(self, state: int):
+        """
+        Look for moves winning at once and for moves stopping the
+        opponent from winning at once, setting rootKeys to the keys of
+        the moves that do not lose at once, None if all of them do
+
+        Return:
+        - The next state if the move is forced, a win or the only block,
+          else None
+        """
+        black, white = toMasks(state)
+        self.rootKeys = None
+        wins = winningMoves(black, white)
+        if wins:
+            self.depth, self.value = 1, oo
+            return applyMove(state, wins[0])
+        blocks = blockingMoves(black, white)
+        if len(blocks) == 1:
+            nextState = applyMove(state, blocks[0])
+            # a block ending the game is a draw, as it neither wins nor loses
+            self.depth, self.value = 1, 0 if terminal(nextState) >= 0 else -self.preeval(self.key(nextState))
+            return nextState
+        if blocks:
+            self.rootKeys = {self.key(applyMove(state, move)) for move in blocks}
+        return None
+
+    def lastDepth(self, state: int, timeLimit: float = None, nodeLimit: int = None) -> int:
+        """
+        Get the deepest iteration of a search, MAX_DEPTH without a budget
+        and the end of the game with one
+        """
+        return self.MAX_DEPTH if timeLimit is None and nodeLimit is None else 36 - pieceCount(state)
+
+    def run(self, state: int, timeLimit: float = None, nodeLimit: int = None):
+        """
+        Search with iterative deepening
+
+        Searches depth 1, 2 and so on, each iteration trying the best
+        line of the previous one first. Without a budget the search stops
+        at MAX_DEPTH and the endgame solver at SOLVE_NODE_LIMIT nodes, with
+        one it goes on until the budget is used up.
+        The transposition table is kept from previous runs.
+
+        Args:
+        - state: the state to move from
+        - timeLimit: the thinking time in seconds, None for no limit
+        - nodeLimit: the number of nodes to visit, None for no limit
+
+        Return:
+        - The best next state of the deepest completed iteration, None if
+          the state is terminal
+        """
+        if terminal(state) >= 0:
+            return None
+        self.stopped, self.nodes = False, 0
+        self.cacheEval.resetStats()
+        deadline = time() + timeLimit if timeLimit is not None else None
+        nextState = self.solveEndgame(state, timeLimit, nodeLimit)
+        if nextState is None:
+            nextState = self.scanThreats(state)
+        if nextState is not None:
+            return nextState
+        # the nodes of an aborted solve count against the budget
+        self.deadline, self.nodeLimit = deadline, nodeLimit
+        return self.deepen(state, self.lastDepth(state, timeLimit, nodeLimit))
+
+    def ponder(self, state: int):
+        """
+        Search a state while the opponent thinks about it, until stop()
+        is called, filling the transposition table for the next run()
+
+        Args:
+        - state: the state the opponent moves from
+        """
+        if terminal(state) >= 0 or 36 - pieceCount(state) <= self.SOLVE_EMPTY_CELLS:
+            return
+        self.deadline, self.nodeLimit, self.nodes = None, None, 0
+        self.rootKeys = None
+        self.deepen(state, 36 - pieceCount(state))
+
+    def newSearch(self):
+        """
+        Make the table entries of earlier searches replaceable, forget the
+        killer moves and age the history so that recent cutoffs count more
+        """
+        self.table.newSearch()
+        for killers in self.killers:
+            killers[:] = [NO_MOVE] * self.KILLER_MOVES
+        self.moveHistory = [x >> 1 for x in self.moveHistory]
+
+    def deepen(self, state: int, lastDepth: int) -> int:
+        """
+        Search a non-terminal state with iterative deepening, within the
+        budget set in deadline, nodeLimit and stopped
+
+        Args:
+        - state: the state to move from
+        - lastDepth: the deepest iteration
+
+        Return:
+        - The best next state of the deepest completed iteration
+        """
+        self.newSearch()
+        # search the table key so that moves stored at the root match the searched states
+        rootKey = self.key(state)
+        keyedStates, nextKeys = self.orderMoves(rootKey)
+        # fall back on the best static move if not even depth 1 completes
+        bestMove = keyedStates[next(x for x in nextKeys if self.rootKeys is None or x in self.rootKeys)][0]
+        for depth in range(1, lastDepth + 1):
+            self.maxDepth = depth
+            try:
+                if depth > 1 and self.ASPIRATION_WINDOW and abs(self.value) < oo:
+                    value = self.aspirationSearch(rootKey, self.value)
+                else:
+                    value = self.traverse(rootKey)
+            except SearchTimeout:
+                break
+            bestMove = self.rootMove
+            # a win or loss found here is not proven, as moves are pruned
+            # and reduced, so the search goes on while the budget lasts
+            self.depth, self.value = depth, value
+        return self.expand(state)[self.key(applyMove(rootKey, bestMove))][1]
+
+
+# the engine of a ParallelMinimax worker process, kept between tasks, and its last search
+workerEngine, workerSearch = None, None
+
+
+def startWorker(useSymmetry: bool, tableBits: int):
+    """
+    Build the engine of a ParallelMinimax worker process
+
+    Args:
+    - useSymmetry, tableBits: see Minimax
+    """
+    global workerEngine
+    workerEngine = Minimax(useSymmetry, tableBits)
+
+
+def searchRootMove(args: tuple) -> tuple:
+    """
+    Search the state after a root move, run by the workers of
+    ParallelMinimax with the tables of their engine
+
+    Args:
+    - args: a (nextKey, depth, maxDepth, deadline, nodeLimit, searchId)
+      tuple, where depth is the distance of nextKey from the root,
+      deadline is a time() value or None and searchId changes with every
+      run()
+
+    Return:
+    - A (value, nodes) pair, value being the value of the move for the
+      root player or None if the budget was used up
+    """
+    global workerSearch
+    nextKey, depth, maxDepth, deadline, nodeLimit, searchId = args
+    engine = workerEngine
+    if searchId != workerSearch:
+        workerSearch = searchId
+        engine.newSearch()
+    engine.maxDepth, engine.deadline, engine.nodeLimit, engine.nodes = maxDepth, deadline, nodeLimit, 0
+    try:
+        return -engine.traverse(nextKey, -oo, oo, depth), engine.nodes
+    except SearchTimeout:
+        return None, engine.nodes
+
+
+class ParallelMinimax(Minimax):
+    """
+    Minimax engine searching the root moves in a pool of processes.
+
+    Every iteration searches each root move considered by Minimax in its
+    own task, with a full window, and only completes when all tasks do.
+    Each worker keeps one engine, so its tables carry move ordering and
+    results over from one task and iteration to the next. Ties go to the
+    move first in static order.
+    """
+
+    def __init__(self, workers: int = None, useSymmetry: bool = False, tableBits: int = 18) -> None:
+        """
+        Constructor
+
+        Args:
+        - workers: the number of processes, all cores if None
+        - useSymmetry: see Minimax
+        - tableBits: the size of the transposition table of every worker,
+          see Minimax
+        """
+        super().__init__(useSymmetry, tableBits)
+        self.workers = workers or os.cpu_count()
+        self.tableBits = tableBits
+        # started with the first search
+        self.pool = None
+        self.searches = 0
+
+    def close(self):
+        """
+        Stop the worker processes
+        """
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool = None
+
+    def ponder(self, state: int):
+        """
+        Do nothing, the tables to fill are in the workers
+        """
+
+    def run(self, state: int, timeLimit: float = None, nodeLimit: int = None):
+        """
+        Search the root moves in parallel with iterative deepening
+
+        Args:
+        - state: the state to move from
+        - timeLimit: the thinking time in seconds, None for no limit
+        - nodeLimit: the number of nodes to visit, None for no limit
+
+        Return:
+        - The best next state of the deepest completed iteration, None if
+          the state is terminal
+        """
+        if terminal(state) >= 0:
+            return None
+        self.stopped, self.nodes = False, 0
+        self.cacheEval.resetStats()
+        deadline = time() + timeLimit if timeLimit is not None else None
+        nextState = self.solveEndgame(state, timeLimit, nodeLimit)
+        if nextState is None:
+            nextState = self.scanThreats(state)
+        if nextState is not None:
+            return nextState
+        if self.pool is None:
+            # spawn so that forking does not copy the threads of the gui
+            self.pool = multiprocessing.get_context("spawn").Pool(self.workers, startWorker, (self.useSymmetry, self.tableBits))
+        self.searches += 1
+        keyedStates, nextKeys = self.orderMoves(self.key(state))
+        nextKeys = [x for x in nextKeys if self.rootKeys is None or x in self.rootKeys][:self.GOOD_MOVES_LIMIT]
+        # fall back on the best static move if not even depth 1 completes
+        bestKey = nextKeys[0]
+        for maxDepth in range(1, self.lastDepth(state, timeLimit, nodeLimit) + 1):
+            # wins and losses are not proven under pruning, so every move is searched again
+            taskLimit = (nodeLimit - self.nodes) // len(nextKeys) if nodeLimit is not None else None
+            tasks = [(nextKey, 1 if i < self.BETTER_MOVES_LIMIT else 2, maxDepth, deadline, taskLimit, self.searches) for i, nextKey in enumerate(nextKeys)]
+            results = self.pool.map(searchRootMove, tasks, chunksize=1)
+            self.nodes += sum(nodes for _, nodes in results)
+            if any(value is None for value, _ in results):
+                break
+            values = [value for value, _ in results]
+            self.depth, self.value = maxDepth, max(values)
+            bestKey = nextKeys[values.index(self.value)]
+        return self.expand(state)[bestKey][1]
 
 
 if __name__ == "__main__":
-    import time
-    start_time = time.time()
+    start_time = time()
     mnm = Minimax()
     # print(mcts.run(259461630))
     # print(mnm.traverse(5115112716510))
     print(mnm.run(0))
-    print("--- %s seconds ---" % (time.time() - start_time))
+    print("--- %s seconds ---" % (time() - start_time))
+    start_time = time()
+    print(mnm.run(5115112716510, timeLimit=2), mnm.depth, mnm.cacheEval.getStats())
+    print("--- %s seconds ---" % (time() - start_time))
+    start_time = time()
+    mnm = ParallelMinimax(4)
+    print(mnm.run(5115112716510, timeLimit=2), mnm.depth)
+    print("--- %s seconds ---" % (time() - start_time))
+    mnm.close()
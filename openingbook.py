@@ -0,0 +1,131 @@
+import os
+import mmap
+import struct
+from gamenode import terminal, applyMove, nextMoves
+from symmetry import canonical, canonicalSymmetry, uniqueMoves, transform, INVERSE_SYMMETRIES
+from minimax import Minimax
+
+
+# default location of the book
+BOOK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "openings.book")
+
+# file layout: a header, then records sorted by canonical state
+BOOK_MAGIC = b"PTBK"
+BOOK_HEADER = struct.Struct("<4sI")
+BOOK_RECORD = struct.Struct("<Qhd")
+
+
+def searchBook(engine: Minimax, state: int, plies: int, bookToMove: bool, timeLimit: float, book: dict):
+    """
+    Collect the book positions reachable from a state
+
+    The book answers in the positions where it is to move and follows
+    every move of the opponent, both for a book playing black and for
+    one playing white.
+
+    Args:
+    - engine: the engine choosing the replies
+    - state: a canonical state
+    - plies: the number of plies left to collect
+    - bookToMove: whether the book is to move in the state
+    - timeLimit: the thinking time per position in seconds
+    - book: the book being built, mapping canonical states to (move,
+      score) pairs where move comes from gamenode.encodeMove
+    """
+    if plies <= 0 or terminal(state) >= 0:
+        return
+    if bookToMove:
+        if state not in book:
+            nextState = engine.run(state, timeLimit=timeLimit)
+            move = next(move for move, x in nextMoves(state) if x == nextState)
+            book[state] = (move, engine.value)
+            print(f"{len(book)} positions, depth {engine.depth}")
+        searchBook(engine, canonical(applyMove(state, book[state][0])), plies - 1, False, timeLimit, book)
+    else:
+        for _, nextState in uniqueMoves(nextMoves(state)):
+            searchBook(engine, canonical(nextState), plies - 1, True, timeLimit, book)
+
+
+def buildBook(path: str = BOOK_PATH, plies: int = 4, timeLimit: float = 10):
+    """
+    Search the openings and write them into a book file
+
+    Args:
+    - path: the file to write
+    - plies: the number of plies from the start covered by the book
+    - timeLimit: the thinking time per position in seconds
+    """
+    engine = Minimax(useSymmetry=True)
+    book = dict()
+    for bookToMove in [True, False]:
+        searchBook(engine, 0, plies, bookToMove, timeLimit, book)
+    with open(path, "wb") as f:
+        f.write(BOOK_HEADER.pack(BOOK_MAGIC, len(book)))
+        for state in sorted(book):
+            f.write(BOOK_RECORD.pack(state, *book[state]))
+
+
+class OpeningBook:
+    """
+    Read-only opening book.
+
+    The file is memory-mapped and searched by bisection, so only the
+    pages that are looked at get loaded.
+    """
+
+    def __init__(self, path: str = BOOK_PATH) -> None:
+        """
+        Constructor
+
+        Args:
+        - path: the book file, see buildBook
+        """
+        with open(path, "rb") as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.size = BOOK_HEADER.unpack_from(self.data)
+        if magic != BOOK_MAGIC or len(self.data) != BOOK_HEADER.size + self.size * BOOK_RECORD.size:
+            self.data.close()
+            raise ValueError(f"{path} is not an opening book")
+
+    def close(self):
+        self.data.close()
+
+    def getRecord(self, index: int) -> tuple:
+        """
+        Get a (canonical state, move, score) record
+        """
+        return BOOK_RECORD.unpack_from(self.data, BOOK_HEADER.size + index * BOOK_RECORD.size)
+
+    def lookup(self, state: int):
+        """
+        Look up the reply to a state
+
+        Args:
+        - state: the state to move from
+
+        Return:
+        - A (nextState, score) pair, None if the state is not in the book
+        """
+        key, symmetry = canonicalSymmetry(state)
+        low, high = 0, self.size
+        while low < high:
+            middle = (low + high) // 2
+            if self.getRecord(middle)[0] < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low == self.size:
+            return None
+        recordKey, move, score = self.getRecord(low)
+        if recordKey != key:
+            return None
+        # the move is stored for the canonical state
+        return transform(applyMove(key, move), INVERSE_SYMMETRIES[symmetry]), score
+
+
+if __name__ == "__main__":
+    import sys
+    # python openingbook.py [plies] [seconds per position]
+    buildBook(BOOK_PATH, *[int(x) for x in sys.argv[1:3]])
+    book = OpeningBook()
+    print(book.size, book.lookup(0))
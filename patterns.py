@@ -0,0 +1,120 @@
+from itertools import product
+from data import *
+from tables import loadTable
+
+
+def coverCells(line, nullifiers) -> list:
+    """
+    Get the cells a scored line depends on, line cells first
+    """
+    ret = list(line)
+    for cell in nullifiers:
+        if cell not in ret:
+            ret.append(cell)
+    return ret
+
+
+def scorePattern(values: dict, line, nullifiers, weights) -> int:
+    """
+    Score a line the way Node.eval does
+
+    Args:
+    - values: the value of every covered (quarter, cell)
+    - line, nullifiers: an entry of LINES_3 or LINES_4
+    - weights: WEIGHT_LINES_3 or WEIGHT_LINES_4
+
+    Return:
+    - Black's score minus white's score for the line
+    """
+    ret = 0
+    for color, sign in [(1, 1), (2, -1)]:
+        if all(values[cell] == color for cell in line):
+            advantage = len(nullifiers)
+            for cell in nullifiers:
+                if values[cell] == color:
+                    advantage = 0
+                    break
+                elif values[cell] == 3 - color:
+                    advantage -= 1
+            ret += sign * weights[advantage]
+    return ret
+
+
+def buildPatterns(data: list, weights: list) -> list:
+    """
+    Precompute the score of every pattern of every scored line
+
+    Args:
+    - data: LINES_3 or LINES_4
+    - weights: the matching weights
+
+    Return:
+    - A list of (cells, table) pairs, one per line, where cells are the
+      covered (quarter, cell) pairs and table[i] is the score of the
+      pattern whose base-3 digits, in the order of cells, spell i
+    """
+    ret = []
+    for line, nullifiers in data:
+        cells = coverCells(line, nullifiers)
+        table = [0] * 3 ** len(cells)
+        for digits in product(range(3), repeat=len(cells)):
+            index = sum(digit * 3 ** i for i, digit in enumerate(digits))
+            table[index] = scorePattern(dict(zip(cells, digits)), line, nullifiers, weights)
+        ret.append((cells, table))
+    return ret
+
+
+def maskPatterns(patterns: list) -> list:
+    """
+    Index pattern tables by masked bitboards instead of base-3 digits
+
+    Args:
+    - patterns: as returned by buildPatterns
+
+    Return:
+    - A list of (key mask, table) pairs, where the key mask selects the
+      covered cells in black | white << 36 and the table maps the masked
+      value to the score, leaving out zero scores
+    """
+    ret = []
+    for cells, table in patterns:
+        bits = [9 * quarter + cell for quarter, cell in cells]
+        keyMask = sum(1 << bit | 1 << (bit + 36) for bit in bits)
+        maskTable = dict()
+        for index, score in enumerate(table):
+            if score:
+                key = 0
+                for bit in bits:
+                    index, digit = divmod(index, 3)
+                    if digit:
+                        key |= 1 << (bit + 36 * (digit - 1))
+                maskTable[key] = score
+        ret.append((keyMask, maskTable))
+    return ret
+
+
+def buildLinePatterns(lines3: list, weights3: list, lines4: list, weights4: list) -> list:
+    """
+    Precompute the pattern tables of LINES_3 followed by LINES_4
+    """
+    return buildPatterns(lines3, weights3) + buildPatterns(lines4, weights4)
+
+
+# pattern tables of all scored lines, rebuilt whenever the lines or the weights change
+LINE_PATTERNS = loadTable("patterns", buildLinePatterns, LINES_3, WEIGHT_LINES_3, LINES_4, WEIGHT_LINES_4)
+LINE_MASK_PATTERNS = maskPatterns(LINE_PATTERNS)
+
+
+def patternsScore(black: int, white: int) -> int:
+    """
+    Score all lines of a position, black's score minus white's score
+    """
+    board = black | white << 36
+    ret = 0
+    for keyMask, table in LINE_MASK_PATTERNS:
+        ret += table.get(board & keyMask, 0)
+    return ret
+
+
+if __name__ == "__main__":
+    print(sum(len(table) for _, table in LINE_PATTERNS), sum(len(table) for _, table in LINE_MASK_PATTERNS))
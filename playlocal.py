@@ -1,7 +1,13 @@
+import os
 from PyQt5.QtCore import *
+from PyQt5.QtGui import QKeySequence
+from PyQt5.QtWidgets import QShortcut
 from gamewindow import GameWindow
-from minimax import Minimax
+from minimax import Minimax, ParallelMinimax
+from mcts import MCTS
+from mctsarray import ArrayMCTS
 from gamenode import Node
+from openingbook import OpeningBook, BOOK_PATH
 
 
 class BotEngine(QThread):
@@ -11,18 +17,95 @@ class BotEngine(QThread):
 
     # signal
     finished = pyqtSignal(object)
+    progress = pyqtSignal(str)
+
+    # thinking time per move in seconds
+    THINK_TIME = 5
+    # processes searching in parallel, 1 to search in the thread itself
+    WORKERS = 1
+    # search while the player thinks
+    PONDER = True
+    # search with MCTS instead of Minimax
+    USE_MCTS = False
+    # keep the MCTS tree in typed arrays, more nodes in less memory but no pondering
+    ARRAY_TREE = True
 
     def __init__(self):
         super().__init__()
-        self.botEngine = Minimax()
+        if self.USE_MCTS:
+            self.botEngine = ArrayMCTS() if self.ARRAY_TREE else MCTS()
+        else:
+            self.botEngine = ParallelMinimax(self.WORKERS) if self.WORKERS > 1 else Minimax()
+        # build it with openingbook.py
+        self.book = OpeningBook(BOOK_PATH) if os.path.exists(BOOK_PATH) else None
+        self.pondering = False
     
     def setState(self, state):
         self.state = state
+
+    def startPondering(self, state):
+        """
+        Search the player's state in the background until stopPondering
+        """
+        if not self.PONDER:
+            return
+        self.stopPondering()
+        # the move may have been emitted before the thread returned
+        self.wait()
+        self.state = state
+        self.pondering = True
+        self.botEngine.stopped = False
+        self.start()
+
+    def stopPondering(self):
+        """
+        Stop pondering and wait for the thread to finish
+        """
+        if self.pondering:
+            self.botEngine.stop()
+            self.wait()
+            self.pondering = False
+
+    def stopSearch(self):
+        """
+        Make the running search move at once with its best move so far
+        """
+        if self.isRunning() and not self.pondering:
+            self.botEngine.stop()
+
+    def close(self):
+        """
+        Stop any search and release the engine's worker processes and the book
+        """
+        self.stopPondering()
+        self.botEngine.stop()
+        self.wait()
+        if hasattr(self.botEngine, "close"):
+            self.botEngine.close()
+        if self.book is not None:
+            self.book.close()
+
+    def reportProgress(self, report: dict):
+        """
+        Emit an MCTS progress report as a status message
+        """
+        visits = report["visits"]
+        share = visits[report["bestMove"]] / max(1, sum(visits.values()))
+        self.progress.emit(f"Thinking... {report['iterations']} iterations ({report['iterationsPerSecond']:.0f}/s), best move has {share:.0%} of the visits")
     
     def run(self):
+        if self.pondering:
+            self.botEngine.ponder(self.state)
+            return
         import time
         start_time = time.time()
-        nextState = self.botEngine.run(self.state)
+        entry = self.book.lookup(self.state) if self.book is not None else None
+        if entry is not None:
+            nextState = entry[0]
+        elif self.USE_MCTS:
+            nextState = self.botEngine.run(self.state, timeLimit=self.THINK_TIME, callback=self.reportProgress)
+        else:
+            nextState = self.botEngine.run(self.state, timeLimit=self.THINK_TIME)
         print("--- %s seconds ---" % (time.time() - start_time))
         self.finished.emit(nextState)
 
@@ -35,18 +118,32 @@ class GameWithBot(GameWindow):
         self.botTurn = botTurn
         self.botEngine = BotEngine()
         self.botEngine.finished.connect(self.botMakeMove)
+        self.botEngine.progress.connect(self.statusBar().showMessage)
+        # move at once with the best move so far
+        QShortcut(QKeySequence("Space"), self, self.botEngine.stopSearch)
         self.gamelog.addLog(f"You play as {'black' if botTurn else 'white'}")
         # show
         self.show()
         # run if bot starts
         if self.botTurn == self.gamelog.currentTurn:
-            # make sure to disable moves
-            self.board.setDisable()
-            self.gamelog.revertButton.setEnabled(False)
-            # run engine
-            self.botEngine.setState(self.board.getState())
-            self.botEngine.start()
-            self.statusBar().showMessage("Thinking...")
+            self.startBot()
+
+    def startBot(self):
+        """
+        Make the bot think about the board
+        """
+        # make sure to disable moves
+        self.board.setDisable()
+        self.gamelog.revertButton.setEnabled(False)
+        # run engine
+        self.botEngine.stopPondering()
+        self.botEngine.setState(self.board.getState())
+        self.botEngine.start()
+        self.statusBar().showMessage("Thinking... (space to move now)")
+
+    def closeEvent(self, a0):
+        self.botEngine.close()
+        super().closeEvent(a0)
 
     @pyqtSlot(object)
     def botMakeMove(self, nextState):
@@ -66,13 +163,10 @@ class GameWithBot(GameWindow):
         else:
             # if it is bot turn
             if self.gamelog.currentTurn == self.botTurn:
-                # make sure to disable moves
-                self.board.setDisable()
-                self.gamelog.revertButton.setEnabled(False)
-                # run engine
-                self.botEngine.setState(self.board.getState())
-                self.botEngine.start()
-                self.statusBar().showMessage("Thinking...")
+                self.startBot()
+            else:
+                # think about the replies while the player moves
+                self.botEngine.startPondering(self.board.getState())
             
 
 if __name__ == "__main__":
@@ -0,0 +1,123 @@
+from random import Random
+from bitboard import *
+from threats import iterWinningMoves
+
+
+# where every bit goes under each rotation, indexed by quarter * 2 + direction
+ROTATED_BITS = [
+    [rotateMask(1 << bit, quarter, direction).bit_length() - 1 for bit in range(36)]
+    for quarter in range(4) for direction in range(2)
+]
+NO_INDICES = [-1] * 9
+
+
+def randomPolicy(black: int, white: int, empty: list, rng: Random) -> tuple:
+    """
+    Play a uniformly random move
+
+    Args:
+    - black, white: the occupancy masks of a non-terminal position
+    - empty: the bits of the empty cells
+    - rng: the random generator
+
+    Return:
+    - The (index in empty, rotation) pair of the move, rotation being
+      quarter * 2 + direction
+    """
+    return rng.randrange(len(empty)), rng.randrange(8)
+
+
+def winFirstPolicy(black: int, white: int, empty: list, rng: Random) -> tuple:
+    """
+    Play a move winning at once if there is one, else a random move.
+    Slower than randomPolicy but the playouts miss fewer obvious wins.
+
+    Args and Return:
+    - Same as randomPolicy
+    """
+    move = next(iterWinningMoves(black, white), None)
+    if move is None:
+        return randomPolicy(black, white, empty, rng)
+    return empty.index(move >> 3), move & 7
+
+
+class Playout:
+    """
+    Plays games to the end on occupancy masks.
+
+    The bits of the empty cells are kept in a list updated after each
+    move, so that every move is legal, along with the index of every bit
+    in it, so that a rotation only moves the entries of its quarter. Only
+    the lines the move touched are checked for a win.
+    """
+
+    def __init__(self, policy=randomPolicy, seed=None) -> None:
+        """
+        Constructor
+
+        Args:
+        - policy: chooses the moves, see randomPolicy
+        - seed: the seed of the random generator, None for a random one
+        """
+        self.policy = policy
+        self.rng = Random(seed)
+
+    def run(self, state: int) -> int:
+        """
+        Play a game from a state to its end
+
+        Args:
+        - state: the state to start from
+
+        Return:
+        - Same as bitboard.findWinner, never -1
+        """
+        black, white = toMasks(state)
+        winner = findWinner(black, white)
+        if winner >= 0:
+            return winner
+        empty = [bit for bit in range(36) if not (black | white) >> bit & 1]
+        # the index of every bit in empty, -1 for occupied cells
+        where = [-1] * 36
+        for i, bit in enumerate(empty):
+            where[bit] = i
+        blackToMove = len(empty) % 2 == 0
+        policy, rng = self.policy, self.rng
+        while True:
+            index, rotation = policy(black, white, empty, rng)
+            # swap with the last cell to remove in constant time
+            bit, last = empty[index], empty[-1]
+            empty[index] = last
+            where[last] = index
+            where[bit] = -1
+            empty.pop()
+            if blackToMove:
+                black |= 1 << bit
+            else:
+                white |= 1 << bit
+            quarter, direction = rotation >> 1, rotation & 1
+            black, white = rotateMask(black, quarter, direction), rotateMask(white, quarter, direction)
+            winner = findWinnerAfterMove(black, white, bit, quarter)
+            if winner >= 0:
+                return winner
+            # only the empty cells of the rotated quarter move
+            low = quarter * 9
+            indices = [i for i in where[low:low + 9] if i >= 0]
+            where[low:low + 9] = NO_INDICES
+            rotated = ROTATED_BITS[rotation]
+            for i in indices:
+                x = rotated[empty[i]]
+                empty[i] = x
+                where[x] = i
+            blackToMove = not blackToMove
+
+
+if __name__ == "__main__":
+    from time import time
+    playout = Playout(seed=0)
+    start_time = time()
+    results = [0, 0, 0]
+    for i in range(10000):
+        results[playout.run(5115112716510)] += 1
+    print("ties, black, white:", results)
+    print("--- %s seconds ---" % (time() - start_time))
@@ -0,0 +1,141 @@
+from data import *
+from tables import loadTable
+
+
+# top-left (row, column) of every quarter on the 6x6 board
+QUARTER_ORIGINS = [(0, 3), (0, 0), (3, 0), (3, 3)]
+
+# the 8 dihedral transformations of the board
+TRANSFORMATIONS = [
+    lambda r, c: (r, c),
+    lambda r, c: (c, 5 - r),
+    lambda r, c: (5 - r, 5 - c),
+    lambda r, c: (5 - c, r),
+    lambda r, c: (r, 5 - c),
+    lambda r, c: (5 - r, c),
+    lambda r, c: (c, r),
+    lambda r, c: (5 - c, 5 - r)
+]
+
+
+def buildPermutations() -> list:
+    """
+    Build the cell permutation of every symmetry
+
+    Return:
+    - A list of 8 permutations, entry 9 * quarter + cell of each is the
+      index the cell is mapped to
+    """
+    position = [(QUARTER_ORIGINS[q][0] + c // 3, QUARTER_ORIGINS[q][1] + c % 3) for q in range(4) for c in range(9)]
+    index = {rc: i for i, rc in enumerate(position)}
+    return [[index[transform(*rc)] for rc in position] for transform in TRANSFORMATIONS]
+
+
+def buildQuarterSymmetries(cellPermutation: list) -> list:
+    """
+    Map every base-3 quarter value to its value after permuting its cells
+    """
+    ret = []
+    for value in range(POW_QUARTERS[1]):
+        digits = [value // POW_CELLS[cell] % 3 for cell in range(9)]
+        ret.append(sum(digit * POW_CELLS[cellPermutation[cell]] for cell, digit in enumerate(digits)))
+    return ret
+
+
+# cell permutations
+PERMUTATIONS = buildPermutations()
+
+# every symmetry moves whole quarters and permutes cells the same way inside each quarter
+QUARTER_PERMUTATIONS = [[permutation[9 * q] // 9 for q in range(4)] for permutation in PERMUTATIONS]
+CELL_PERMUTATIONS = [[permutation[c] % 9 for c in range(9)] for permutation in PERMUTATIONS]
+
+# base-3 quarter values after each symmetry
+QUARTER_SYMMETRIES = [loadTable(f"symmetry{i}", buildQuarterSymmetries, cells) for i, cells in enumerate(CELL_PERMUTATIONS)]
+
+# quarter weights after each symmetry
+POW_SYMMETRIES = [[POW_QUARTERS[q] for q in quarters] for quarters in QUARTER_PERMUTATIONS]
+
+# index of the symmetry undoing each symmetry
+INVERSE_SYMMETRIES = [next(j for j, other in enumerate(PERMUTATIONS) if all(other[x] == i for i, x in enumerate(permutation))) for permutation in PERMUTATIONS]
+
+
+def transform(state: int, symmetry: int) -> int:
+    """
+    Apply a symmetry to a state
+
+    Args:
+    - state: the state to transform
+    - symmetry: the index of the symmetry in TRANSFORMATIONS
+
+    Return:
+    - The transformed state
+    """
+    table, weights = QUARTER_SYMMETRIES[symmetry], POW_SYMMETRIES[symmetry]
+    ret = 0
+    for quarter in range(4):
+        state, value = divmod(state, POW_QUARTERS[1])
+        ret += table[value] * weights[quarter]
+    return ret
+
+
+def canonical(state: int) -> int:
+    """
+    Get the smallest state among the symmetric twins of a state
+    """
+    ret, values = state, []
+    for quarter in range(4):
+        state, value = divmod(state, POW_QUARTERS[1])
+        values.append(value)
+    for symmetry in range(1, 8):
+        table, weights = QUARTER_SYMMETRIES[symmetry], POW_SYMMETRIES[symmetry]
+        twin = table[values[0]] * weights[0] + table[values[1]] * weights[1] + table[values[2]] * weights[2] + table[values[3]] * weights[3]
+        if twin < ret:
+            ret = twin
+    return ret
+
+
+def canonicalSymmetry(state: int) -> tuple:
+    """
+    Get the canonical form of a state along with the symmetry leading to it
+
+    Return:
+    - A (canonical state, symmetry) pair such that transform(state,
+      symmetry) is the canonical state, and transform(canonical state,
+      INVERSE_SYMMETRIES[symmetry]) is the state
+    """
+    ret = (state, 0)
+    for symmetry in range(1, 8):
+        twin = transform(state, symmetry)
+        if twin < ret[0]:
+            ret = (twin, symmetry)
+    return ret
+
+
+def uniqueStates(states: list) -> list:
+    """
+    Keep one state of every symmetry class, in the original order
+    """
+    ret = dict()
+    for state in states:
+        ret.setdefault(canonical(state), state)
+    return list(ret.values())
+
+
+def uniqueMoves(moves):
+    """
+    Lazily keep the first move into every symmetry class
+
+    Args:
+    - moves: (move, nextState) pairs as generated by Node.nextMoves
+    """
+    generated = set()
+    for move, nextState in moves:
+        key = canonical(nextState)
+        if key not in generated:
+            generated.add(key)
+            yield move, nextState
+
+
+if __name__ == "__main__":
+    from gamenode import Node
+    print(len(Node(0).possibleNextStates()), len(uniqueStates(Node(0).possibleNextStates())))
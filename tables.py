@@ -0,0 +1,121 @@
+import os
+import pickle
+from data import *
+
+
+# rotation lists in the order used for move generation
+ROTATIONS = [ROTATE_CW, ROTATE_CCW]
+
+# occupancy of a quarter
+QUARTER_MASK = 511
+
+# directory holding the cached tables
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "__tablecache__")
+
+
+def loadTable(name: str, builder, *args):
+    """
+    Load a table from the disk cache, building and saving it if needed
+
+    Args:
+    - name: the cache entry name
+    - builder: the function building the table
+    - args: the data the table is built from, saved along with the table
+      so that editing data.py rebuilds it
+
+    Return:
+    - The table
+    """
+    path = os.path.join(CACHE_DIR, name + ".pickle")
+    try:
+        with open(path, "rb") as f:
+            cachedArgs, table = pickle.load(f)
+        if cachedArgs == args:
+            return table
+    except (OSError, EOFError, ValueError, pickle.UnpicklingError):
+        pass
+    table = builder(*args)
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(path, "wb") as f:
+            pickle.dump((args, table), f, pickle.HIGHEST_PROTOCOL)
+    except OSError:
+        # the cache is only an optimization
+        pass
+    return table
+
+
+def buildQuarterRotations(swapList: list) -> list:
+    """
+    Map every base-3 quarter value to its value after a rotation
+    """
+    ret = []
+    for value in range(POW_QUARTERS[1]):
+        digits = [value // POW_CELLS[cell] % 3 for cell in range(9)]
+        for i, j in swapList:
+            digits[i], digits[j] = digits[j], digits[i]
+        ret.append(sum(digit * POW_CELLS[cell] for cell, digit in enumerate(digits)))
+    return ret
+
+
+def buildQuarterBits() -> list:
+    """
+    Map every base-3 quarter value to its packed black/white bits
+
+    Return:
+    - A list where the lower 9 bits of entry i are the black cells of
+      quarter value i and the upper 9 bits are its white cells
+    """
+    ret = [0] * POW_QUARTERS[1]
+    for value in range(1, POW_QUARTERS[1]):
+        digit, rest = value % 3, ret[value // 3]
+        black, white = (rest & QUARTER_MASK) << 1, (rest >> 9) << 1
+        if digit == 1:
+            black |= 1
+        elif digit == 2:
+            white |= 1
+        ret[value] = black | white << 9
+    return ret
+
+
+def buildQuarterValues() -> list:
+    """
+    Map every 9-bit quarter mask to the base-3 value of its set cells
+    """
+    ret = [0] * (QUARTER_MASK + 1)
+    for mask in range(QUARTER_MASK + 1):
+        for cell in range(9):
+            if mask >> cell & 1:
+                ret[mask] += POW_CELLS[cell]
+    return ret
+
+
+def buildMaskRotations(swapList: list) -> list:
+    """
+    Map every 9-bit quarter mask to the mask after a rotation
+    """
+    ret = []
+    for mask in range(QUARTER_MASK + 1):
+        bits = [mask >> cell & 1 for cell in range(9)]
+        for i, j in swapList:
+            bits[i], bits[j] = bits[j], bits[i]
+        ret.append(sum(bit << cell for cell, bit in enumerate(bits)))
+    return ret
+
+
+# base-3 quarter rotations, indexed by direction then quarter value
+QUARTER_ROTATIONS = [loadTable(f"rotations{i}", buildQuarterRotations, swapList) for i, swapList in enumerate(ROTATIONS)]
+
+# conversion between base-3 quarters and occupancy masks
+QUARTER_BITS = loadTable("quarterbits", buildQuarterBits)
+QUARTER_VALUES = buildQuarterValues()
+
+# number of pieces of every base-3 quarter value
+QUARTER_PIECES = [bin(bits).count("1") for bits in QUARTER_BITS]
+
+# occupancy mask rotations, indexed by direction then 9-bit mask
+MASK_ROTATIONS = [buildMaskRotations(swapList) for swapList in ROTATIONS]
+
+
+if __name__ == "__main__":
+    print(QUARTER_ROTATIONS[0][POW_CELLS[0]], QUARTER_ROTATIONS[1][POW_CELLS[0]])
@@ -0,0 +1,45 @@
+import os
+import sys
+import random
+import pytest
+
+# the tested modules live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data import ROTATE_CW, ROTATE_CCW
+from refnode import Node as ReferenceNode
+
+
+def randomStates(count: int, seed: int) -> list:
+    """
+    Collect the states of random games played with the reference Node
+
+    Args:
+    - count: the number of states
+    - seed: the seed of the random moves
+
+    Return:
+    - The states in game order, ended games included
+    """
+    rng = random.Random(seed)
+    ret = []
+    while len(ret) < count:
+        node = ReferenceNode(0)
+        ret.append(node.getState())
+        while node.terminal() < 0:
+            quarter, cell = rng.choice(node.getEmptyCells())
+            node.fillCell(quarter, cell)
+            node.rotate(rng.randrange(4), rng.choice([ROTATE_CW, ROTATE_CCW]))
+            ret.append(node.getState())
+    return ret[:count]
+
+
+@pytest.fixture(scope="session")
+def states() -> list:
+    return randomStates(1500, 20211129)
+
+
+@pytest.fixture(scope="session")
+def openStates(states) -> list:
+    # a sample of the states where the game goes on
+    return [state for state in states if ReferenceNode(state).terminal() < 0][::8]
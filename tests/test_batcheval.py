@@ -0,0 +1,12 @@
+from batcheval import evaluateBatch
+from refnode import Node as ReferenceNode
+
+
+def test_evaluate_batch(states):
+    assert list(evaluateBatch(states)) == [ReferenceNode(state).eval() for state in states]
+
+
+def test_children(openStates):
+    for state in openStates[:40]:
+        nextStates = ReferenceNode(state).possibleNextStates()
+        assert list(evaluateBatch(nextStates)) == [ReferenceNode(nextState).eval() for nextState in nextStates]
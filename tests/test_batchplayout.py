@@ -0,0 +1,43 @@
+import random
+import numpy as np
+from data import ROTATE_CW, ROTATE_CCW
+from bitboard import toMasks
+from batchplayout import BatchPlayout, findWinners, rotateMasks
+from playout import Playout
+from refnode import Node as ReferenceNode
+
+
+def test_find_winners(states):
+    masks = [toMasks(state) for state in states]
+    black, white = np.array(masks, dtype=np.uint64).T
+    assert findWinners(black, white).tolist() == [ReferenceNode(state).terminal() for state in states]
+
+
+def test_rotate_masks(states):
+    rng = random.Random(3)
+    rotations = [rng.randrange(8) for _ in states]
+    black, white = np.array([toMasks(state) for state in states], dtype=np.uint64).T
+    quarters, directions = np.array(rotations) >> 1, np.array(rotations) & 1
+    black, white = rotateMasks(black, quarters, directions), rotateMasks(white, quarters, directions)
+    for state, rotation, nextBlack, nextWhite in zip(states, rotations, black.tolist(), white.tolist()):
+        reference = ReferenceNode(state)
+        reference.rotate(rotation >> 1, [ROTATE_CW, ROTATE_CCW][rotation & 1])
+        assert (nextBlack, nextWhite) == toMasks(reference.getState())
+
+
+def test_same_results_as_playout(openStates):
+    # both play uniformly random legal moves, so the tallies agree within
+    # sampling error, five standard errors for fixed seeds
+    count = 2000
+    batchPlayout, playout = BatchPlayout(0), Playout(seed=0)
+    for state in openStates[::12]:
+        color = ReferenceNode(state).getTurn()
+        batch = batchPlayout.run(state, count)
+        scalar = [0, 0, 0]
+        for i in range(count):
+            winner = playout.run(state)
+            scalar[0 if winner == 3 - color else 1 if winner == 0 else 2] += 1
+        assert sum(batch) == count
+        for batchCount, scalarCount in zip(batch, scalar):
+            p = (batchCount + scalarCount) / (2 * count)
+            assert abs(batchCount - scalarCount) / count <= 5 * (2 * p * (1 - p) / count) ** 0.5 + 1e-9
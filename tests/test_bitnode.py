@@ -0,0 +1,42 @@
+import random
+from data import ROTATE_CW, ROTATE_CCW
+from bitnode import BitNode
+from refnode import Node as ReferenceNode
+
+
+def test_cells(states):
+    for state in states:
+        node, reference = BitNode(state), ReferenceNode(state)
+        assert node.getState() == state
+        assert [node.getQuarter(quarter) for quarter in range(4)] == [reference.getQuarter(quarter) for quarter in range(4)]
+        assert node.getEmptyCells() == reference.getEmptyCells()
+        assert node.countEmptyCells() == reference.countEmptyCells()
+        assert node.getTurn() == reference.getTurn()
+
+
+def test_terminal(states):
+    for state in states:
+        assert BitNode(state).terminal() == ReferenceNode(state).terminal()
+
+
+def test_eval(states):
+    for state in states:
+        assert BitNode(state).eval() == ReferenceNode(state).eval()
+
+
+def test_children(openStates):
+    for state in openStates:
+        assert sorted(BitNode(state).possibleNextStates()) == sorted(ReferenceNode(state).possibleNextStates())
+
+
+def test_make_move(openStates):
+    rng = random.Random(1)
+    for state in openStates:
+        node, reference = BitNode(state), ReferenceNode(state)
+        quarter, cell = rng.choice(reference.getEmptyCells())
+        rotatedQuarter, swapList = rng.randrange(4), rng.choice([ROTATE_CW, ROTATE_CCW])
+        winner = node.makeMove(quarter, cell, rotatedQuarter, swapList)
+        reference.fillCell(quarter, cell)
+        reference.rotate(rotatedQuarter, swapList)
+        assert node.getState() == reference.getState()
+        assert winner == reference.terminal()
@@ -0,0 +1,27 @@
+from deltaeval import DeltaEvaluator
+from refnode import Node as ReferenceNode
+
+
+def test_eval(openStates):
+    for state in openStates:
+        assert DeltaEvaluator(state).eval() == ReferenceNode(state).eval()
+
+
+def test_children(openStates):
+    for state in openStates:
+        evaluator = DeltaEvaluator(state)
+        nextStates = []
+        for move, nextState, score in evaluator.nextMoves():
+            assert score == ReferenceNode(nextState).eval()
+            assert evaluator.evalMove(move) == score
+            nextStates.append(nextState)
+        assert sorted(nextStates) == sorted(ReferenceNode(state).possibleNextStates())
+
+
+def test_set_state(openStates):
+    # one evaluator reused across parents
+    evaluator = DeltaEvaluator()
+    for state in openStates:
+        evaluator.setState(state)
+        assert evaluator.getState() == state
+        assert evaluator.eval() == ReferenceNode(state).eval()
@@ -0,0 +1,22 @@
+from minimax import Minimax
+from refnode import Node as ReferenceNode
+
+# ten empty cells, a win that takes the solver several seconds
+SLOW_STATE = 129410031304412457
+
+
+def test_solver_budget():
+    engine = Minimax()
+    engine.SOLVE_EMPTY_CELLS = 10
+    nextState = engine.run(SLOW_STATE, nodeLimit=4000)
+    # the solver stops at half the budget and the search uses the rest
+    assert engine.nodes <= 4001
+    assert nextState in ReferenceNode(SLOW_STATE).possibleNextStates()
+
+
+def test_solver_without_budget():
+    engine = Minimax()
+    engine.SOLVE_EMPTY_CELLS = 10
+    nextState = engine.run(SLOW_STATE)
+    assert engine.solver.nodes <= engine.SOLVE_NODE_LIMIT + 1
+    assert nextState in ReferenceNode(SLOW_STATE).possibleNextStates()
@@ -0,0 +1,28 @@
+from gamenode import Node, terminal, turn, children, evaluate, nextMoves, applyMove
+from refnode import Node as ReferenceNode
+
+
+def test_functions(states):
+    for state in states:
+        reference = ReferenceNode(state)
+        assert terminal(state) == reference.terminal()
+        assert turn(state) == reference.getTurn()
+        assert evaluate(state) == reference.eval()
+
+
+def test_node(states):
+    for state in states:
+        node, reference = Node(state), ReferenceNode(state)
+        assert node.eval() == reference.eval()
+        assert node.terminal() == reference.terminal()
+        assert node.getEmptyCells() == reference.getEmptyCells()
+
+
+def test_children(openStates):
+    for state in openStates:
+        expected = sorted(ReferenceNode(state).possibleNextStates())
+        assert sorted(children(state)) == expected
+        assert sorted(Node(state).possibleNextStates()) == expected
+        # move codes replay to the generated states
+        for move, nextState in nextMoves(state):
+            assert applyMove(state, move) == nextState
@@ -0,0 +1,28 @@
+from collections import Counter
+from mcts import MCTS
+from mctsarray import ArrayMCTS
+
+
+def rootStats(engine, state: int) -> dict:
+    return {nextState: (log.wins, log.ties, log.loses) for nextState, log in engine.rootMoves(state).items()}
+
+
+def test_same_root_statistics(openStates):
+    # MCTS merges transpositions into one node while ArrayMCTS keeps a
+    # plain tree, so the searches agree as long as no state is reached twice
+    checked = 0
+    for i, state in enumerate(openStates[::12]):
+        for useSymmetry in (False, True):
+            engine, arrayEngine = MCTS(useSymmetry, seed=i), ArrayMCTS(useSymmetry, seed=i)
+            nextState = engine.start(state)
+            assert arrayEngine.start(state) == nextState
+            if nextState is not None:
+                continue
+            engine.search(state, 200)
+            arrayEngine.search(state, 200)
+            parents = Counter(engine.key(x) for data in engine.history.values() for x in data.visitedMoves)
+            if max(parents.values()) == 1:
+                assert rootStats(arrayEngine, state) == rootStats(engine, state)
+                checked += 1
+    assert checked >= 5
+
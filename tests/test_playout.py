@@ -0,0 +1,61 @@
+from data import ROTATE_CW, ROTATE_CCW
+from bitboard import fromMasks
+from threats import winningMoves
+from playout import Playout, randomPolicy, winFirstPolicy
+from refnode import Node as ReferenceNode
+
+
+def recordGame(state: int, policy, seed: int) -> tuple:
+    """
+    Play a game with Playout, recording the positions and the moves
+
+    Return:
+    - A (winner, plies) pair, plies being (black, white, empty, index,
+      rotation) tuples
+    """
+    plies = []
+
+    def recordingPolicy(black, white, empty, rng):
+        index, rotation = policy(black, white, empty, rng)
+        plies.append((black, white, list(empty), index, rotation))
+        return index, rotation
+
+    return Playout(recordingPolicy, seed).run(state), plies
+
+
+def checkGame(state: int, winner: int, plies: list):
+    # every ply is a legal move of the reference Node from the previous position
+    node = ReferenceNode(state)
+    for black, white, empty, index, rotation in plies:
+        assert node.terminal() < 0
+        assert fromMasks(black, white) == node.getState()
+        assert sorted(empty) == sorted(9 * quarter + cell for quarter, cell in node.getEmptyCells())
+        bit = empty[index]
+        node.fillCell(bit // 9, bit % 9)
+        node.rotate(rotation >> 1, [ROTATE_CW, ROTATE_CCW][rotation & 1])
+    assert node.terminal() == winner
+
+
+def test_random_games(openStates):
+    for i, state in enumerate(openStates):
+        winner, plies = recordGame(state, randomPolicy, i)
+        checkGame(state, winner, plies)
+
+
+def test_win_first_games(openStates):
+    for i, state in enumerate(openStates[::2]):
+        winner, plies = recordGame(state, winFirstPolicy, i)
+        checkGame(state, winner, plies)
+        # the game ends at the first ply with a win, won by the mover
+        for ply, (black, white, empty, index, rotation) in enumerate(plies):
+            if winningMoves(black, white):
+                assert ply == len(plies) - 1
+                assert winner == ReferenceNode(fromMasks(black, white)).getTurn()
+
+
+def test_ended_games(states):
+    playout = Playout(seed=0)
+    for state in states:
+        winner = ReferenceNode(state).terminal()
+        if winner >= 0:
+            assert playout.run(state) == winner
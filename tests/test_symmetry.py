@@ -0,0 +1,57 @@
+from symmetry import transform, canonical, canonicalSymmetry, uniqueMoves, INVERSE_SYMMETRIES
+from gamenode import nextMoves
+from refnode import Node as ReferenceNode
+
+# (quarter, cell) of every board position, row by row
+LAYOUT = [[position for position in row if position != (-1, -1)] for row in ReferenceNode.displayOrder if row[0] != (-1, -1)]
+
+
+def boardTwins(state: int) -> set:
+    """
+    Get the 8 symmetric twins of a state by turning and mirroring its board
+    """
+    node = ReferenceNode(state)
+    board = [[node.getCell(quarter, cell) for quarter, cell in row] for row in LAYOUT]
+    ret = set()
+    for i in range(4):
+        # turn a quarter of a circle, then mirror
+        board = [list(row) for row in zip(*board[::-1])]
+        for twin in (board, [row[::-1] for row in board]):
+            ret.add(sum(twin[r][c] * 3 ** (9 * quarter + cell) for r, row in enumerate(LAYOUT) for c, (quarter, cell) in enumerate(row)))
+    return ret
+
+
+def test_transform(states):
+    for state in states[::3]:
+        assert {transform(state, symmetry) for symmetry in range(8)} == boardTwins(state)
+
+
+def test_canonical(states):
+    for state in states[::3]:
+        twins = boardTwins(state)
+        assert canonical(state) == min(twins)
+        key, symmetry = canonicalSymmetry(state)
+        assert key == min(twins) and transform(state, symmetry) == key
+        assert transform(key, INVERSE_SYMMETRIES[symmetry]) == state
+
+
+def test_twins_play_alike(openStates):
+    # twins end alike and have twin children
+    for state in openStates[::4]:
+        children = {canonical(nextState) for nextState in ReferenceNode(state).possibleNextStates()}
+        for twin in boardTwins(state):
+            reference = ReferenceNode(twin)
+            assert reference.terminal() == ReferenceNode(state).terminal()
+            assert {canonical(nextState) for nextState in reference.possibleNextStates()} == children
+
+
+def test_unique_moves(openStates):
+    for state in openStates:
+        moves = list(nextMoves(state))
+        unique = list(uniqueMoves(moves))
+        # the first move into every class, in generation order
+        first = dict()
+        for move, nextState in moves:
+            first.setdefault(canonical(nextState), (move, nextState))
+        assert unique == list(first.values())
+        assert {canonical(nextState) for nextState in ReferenceNode(state).possibleNextStates()} == set(first)
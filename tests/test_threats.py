@@ -0,0 +1,50 @@
+from data import ROTATE_CW, ROTATE_CCW
+from bitboard import toMasks
+from threats import winningMoves, blockingMoves
+from refnode import Node as ReferenceNode
+
+
+def playReference(state: int, move: int) -> ReferenceNode:
+    """
+    Play a move code on a reference Node
+    """
+    bit, quarter, direction = move >> 3, move >> 1 & 3, move & 1
+    node = ReferenceNode(state)
+    node.fillCell(bit // 9, bit % 9)
+    node.rotate(quarter, [ROTATE_CW, ROTATE_CCW][direction])
+    return node
+
+
+def legalMoves(state: int) -> list:
+    empty = ReferenceNode(state).getEmptyCells()
+    return [move for move in range(288) if ((move >> 3) // 9, (move >> 3) % 9) in empty]
+
+
+def referenceWins(state: int) -> list:
+    turn = ReferenceNode(state).getTurn()
+    return [move for move in legalMoves(state) if playReference(state, move).terminal() == turn]
+
+
+def test_winning_moves(openStates):
+    for state in openStates:
+        assert winningMoves(*toMasks(state)) == referenceWins(state)
+
+
+def test_blocking_moves(openStates):
+    # positions where the opponent threatens to win, with few children to check
+    threatened = [state for state in openStates if ReferenceNode(state).countEmptyCells() <= 24]
+    threatened = [state for state in threatened if referenceWins(playReference(state, legalMoves(state)[0]).getState())][:4]
+    assert threatened
+    for state in threatened:
+        opponent = 3 - ReferenceNode(state).getTurn()
+        expected = set()
+        for move in legalMoves(state):
+            node = playReference(state, move)
+            winner = node.terminal()
+            if winner != opponent and (winner >= 0 or not referenceWins(node.getState())):
+                expected.add(node.getState())
+        moves = blockingMoves(*toMasks(state))
+        nextStates = [playReference(state, move).getState() for move in moves]
+        # one move per next state
+        assert len(set(nextStates)) == len(nextStates)
+        assert set(nextStates) == expected
@@ -0,0 +1,69 @@
+from transposition import *
+from refnode import Node as ReferenceNode
+
+oo = 10 ** 18
+
+
+def test_zobrist_key(states):
+    keys = dict()
+    for state in states:
+        node = ReferenceNode(state)
+        # the xor of the keys of the single pieces
+        key = 0
+        for quarter in range(4):
+            for cell in range(9):
+                color = node.getCell(quarter, cell)
+                if color:
+                    key ^= zobristKey(color * 3 ** (9 * quarter + cell))
+        assert zobristKey(state) == key
+        assert keys.setdefault(key, state) == state
+
+
+def test_store_lookup(states):
+    table = TranspositionTable(16)
+    stored = dict()
+    for i, state in enumerate(sorted(set(states))[:200]):
+        key = zobristKey(state)
+        value = [oo, -oo, i, -i][i % 4]
+        table.store(key, value, i % 10, i % 3, i % 288)
+        # one state per entry
+        assert key & table.mask not in stored
+        stored[key & table.mask] = (key, (value, i % 10, i % 3, i % 288))
+    for key, entry in stored.values():
+        assert table.lookup(key) == entry
+        assert type(table.lookup(key)[0]) is int
+    assert table.lookup(zobristKey(states[300]) ^ 1 << 40) is None
+
+
+def test_replacement():
+    table = TranspositionTable(4)
+    # keys sharing the low bits share an entry
+    first, second = 5 | 1 << 20, 5 | 2 << 20
+    table.store(first, 10, 6, EXACT, 17)
+    # a shallower search of another state does not replace a deeper entry
+    table.store(second, 20, 2, LOWER, 18)
+    assert table.lookup(first) == (10, 6, EXACT, 17)
+    assert table.lookup(second) is None
+    # the same state is always replaced, keeping its move when there is no new one
+    table.store(first, 11, 1, UPPER, NO_MOVE)
+    assert table.lookup(first) == (11, 1, UPPER, 17)
+    # not searched deeper, so another state takes the entry
+    table.store(second, 20, 1, LOWER, 18)
+    assert table.lookup(second) == (20, 1, LOWER, 18)
+    assert table.lookup(first) is None
+    # entries of earlier searches give way to any draft
+    table.newSearch()
+    table.store(first, 30, 0, EXACT, NO_MOVE)
+    assert table.lookup(first) == (30, 0, EXACT, NO_MOVE)
+
+
+def test_generations():
+    table = TranspositionTable(4)
+    table.store(3, 1, 5, EXACT, 0)
+    for i in range(600):
+        table.newSearch()
+        # generation 0 marks empty entries
+        assert 1 <= table.generation <= 255
+    assert table.lookup(3) == (1, 5, EXACT, 0)
+    table.clear()
+    assert table.lookup(3) is None
@@ -0,0 +1,90 @@
+from bitboard import *
+
+
+# LINES_5 masks before each rotation, indexed by quarter * 2 + direction
+LINE_PREIMAGES_5 = [
+    sorted(set(rotateMask(line, quarter, 1 - direction) for line in LINE_MASKS_5))
+    for quarter in range(4) for direction in range(2)
+]
+
+
+def iterWinningMoves(black: int, white: int):
+    """
+    Lazily find the moves winning at once for the player to move.
+
+    A move wins with a line if the cells ending up in the line after the
+    rotation are all the mover's but for at most the placed one, so every
+    rotation is checked against the lines pulled back through it.
+
+    Args:
+    - black, white: the occupancy masks of a non-terminal position
+
+    Yield:
+    - Move codes, see gamenode.encodeMove, possibly repeated
+    """
+    occupied = black | white
+    turn = popCount(occupied) % 2 + 1
+    mover, other = (black, white) if turn == 1 else (white, black)
+    empty = FULL_MASK ^ occupied
+    for rotation, lines in enumerate(LINE_PREIMAGES_5):
+        for line in lines:
+            missing = line & ~mover
+            # the placed piece can fill one empty cell of the line
+            if missing & other or missing & (missing - 1):
+                continue
+            bits = empty if missing == 0 else missing
+            while bits:
+                bit = (bits & -bits).bit_length() - 1
+                bits &= bits - 1
+                move = bit << 3 | rotation
+                # the opponent may complete a line too, which is a tie
+                if findWinnerAfterMove(*playMove(black, white, move), bit, rotation >> 1) == turn:
+                    yield move
+
+
+def winningMoves(black: int, white: int) -> list:
+    """
+    Find all moves winning at once for the player to move
+
+    Args:
+    - black, white: the occupancy masks of a non-terminal position
+
+    Return:
+    - The sorted move codes
+    """
+    return sorted(set(iterWinningMoves(black, white)))
+
+
+def blockingMoves(black: int, white: int) -> list:
+    """
+    Find the moves after which the opponent cannot win at once
+
+    Args:
+    - black, white: the occupancy masks of a non-terminal position
+
+    Return:
+    - The move codes in gamenode.nextMoves order, moves leading to an
+      already checked state skipped
+    """
+    occupied = black | white
+    turn = popCount(occupied) % 2 + 1
+    # five in a row needs four pieces before the move
+    opponentThreats = popCount(white if turn == 1 else black) >= 4
+    ret = []
+    for move, nextBlack, nextWhite in generateMaskMoves(black, white):
+        if not opponentThreats:
+            ret.append(move)
+            continue
+        winnerColor = findWinnerAfterMove(nextBlack, nextWhite, move >> 3, move >> 1 & 3)
+        if winnerColor == 3 - turn:
+            continue
+        if winnerColor >= 0 or next(iterWinningMoves(nextBlack, nextWhite), None) is None:
+            ret.append(move)
+    return ret
+
+
+if __name__ == "__main__":
+    # black to move with four in a row
+    black, white = cellsMask([(1, 0), (1, 1), (1, 2), (0, 0)]), cellsMask([(2, 0), (2, 4), (2, 8), (3, 6)])
+    print(winningMoves(black, white))
+    print(len(blockingMoves(white, black | cellsMask([(3, 4)]))))
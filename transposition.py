@@ -0,0 +1,144 @@
+from array import array
+from random import Random
+from data import *
+
+
+# bound types of stored values
+EXACT, LOWER, UPPER = 0, 1, 2
+
+# draft of values that do not depend on the search depth, like terminal states
+DRAFT_INFINITE = 127
+
+# stored when there is no best move
+NO_MOVE = -1
+
+
+def buildZobristQuarters(seed: int) -> list:
+    """
+    Build the Zobrist keys of base-3 quarter values
+
+    Every (quarter, cell, color) gets a random 64-bit key and the key of
+    a quarter value is the xor of the keys of its pieces.
+
+    Args:
+    - seed: the seed of the random keys
+
+    Return:
+    - A list of 4 lists, entry value of list quarter is the key of the
+      quarter value
+    """
+    rng = Random(seed)
+    ret = []
+    for quarter in range(4):
+        keys = [0]
+        for cell in range(9):
+            cellKeys = [0, rng.getrandbits(64), rng.getrandbits(64)]
+            # value digit * 3 ** cell + rest is at index digit * len(keys) + rest
+            keys = [key ^ cellKeys[digit] for digit in range(3) for key in keys]
+        ret.append(keys)
+    return ret
+
+
+# Zobrist keys, indexed by quarter then quarter value
+ZOBRIST_QUARTERS = buildZobristQuarters(20211129)
+
+
+def zobristKey(state: int) -> int:
+    """
+    Get the 64-bit Zobrist key of a state
+    """
+    ret = 0
+    for quarter in range(4):
+        state, value = divmod(state, POW_QUARTERS[1])
+        ret ^= ZOBRIST_QUARTERS[quarter][value]
+    return ret
+
+
+class TranspositionTable:
+    """
+    Fixed size transposition table.
+
+    Entries live in typed arrays indexed by the low bits of the Zobrist
+    key and hold the full key, the value, the draft (the depth searched
+    below the state), the bound type, the best move and the search that
+    stored them. A new entry replaces an old one of another state only if
+    the old one comes from an earlier search or was not searched deeper.
+    """
+
+    def __init__(self, sizeBits: int = 20) -> None:
+        """
+        Constructor
+
+        Args:
+        - sizeBits: the table holds 2 ** sizeBits entries
+        """
+        self.size = 1 << sizeBits
+        self.mask = self.size - 1
+        self.clear()
+
+    def clear(self):
+        """
+        Remove all entries
+        """
+        self.keys = array("Q", bytes(8 * self.size))
+        self.values = array("q", bytes(8 * self.size))
+        self.drafts = array("b", bytes(self.size))
+        self.bounds = array("b", bytes(self.size))
+        self.moves = array("h", bytes(2 * self.size))
+        # generation 0 marks empty entries
+        self.generations = array("B", bytes(self.size))
+        self.generation = 1
+
+    def newSearch(self):
+        """
+        Start a new search, making the entries of earlier searches replaceable
+        """
+        self.generation = self.generation % 255 + 1
+
+    def lookup(self, key: int):
+        """
+        Look up a state
+
+        Args:
+        - key: the Zobrist key of the state
+
+        Return:
+        - A (value, draft, bound, move) tuple, None if the state is not stored
+        """
+        index = key & self.mask
+        if self.generations[index] and self.keys[index] == key:
+            return self.values[index], self.drafts[index], self.bounds[index], self.moves[index]
+        return None
+
+    def store(self, key: int, value, draft: int, bound: int, move: int):
+        """
+        Store the search result of a state
+
+        Args:
+        - key: the Zobrist key of the state
+        - value: the value for the player to move
+        - draft: the depth searched below the state
+        - bound: EXACT, LOWER if the value is a lower bound, UPPER if it is
+          an upper bound
+        - move: the best move found, NO_MOVE if none
+        """
+        index = key & self.mask
+        if self.keys[index] == key:
+            # keep the old best move when there is no new one
+            if move == NO_MOVE:
+                move = self.moves[index]
+        elif self.generations[index] == self.generation and self.drafts[index] > draft:
+            return
+        self.keys[index] = key
+        self.values[index] = value
+        self.drafts[index] = draft
+        self.bounds[index] = bound
+        self.moves[index] = move
+        self.generations[index] = self.generation
+
+
+if __name__ == "__main__":
+    table = TranspositionTable(16)
+    key = zobristKey(5115112716510)
+    table.store(key, 42, 3, EXACT, 17)
+    print(hex(key), table.lookup(key), table.lookup(zobristKey(0)))